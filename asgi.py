@@ -0,0 +1,7 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")  # root-level settings.py
+# Makes DB_POOL_MODE default to "pool" (see settings.py)
+os.environ.setdefault("CREDIT_SERVER_INTERFACE", "asgi")
+application = get_asgi_application()
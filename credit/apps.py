@@ -1,16 +1,18 @@
 # credit/apps.py
 from django.apps import AppConfig
-import os
+
 
 class CreditConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "credit"
 
     def ready(self):
-        # Only run once, not on autoreload
-        if os.environ.get("RUN_MAIN") == "true":
-            # Import the loader function but don't execute immediately
-            from .services.ingestion import load_initial_data_safe
-            # Run it in a background thread so it doesn't block server startup
-            import threading
-            threading.Thread(target=load_initial_data_safe, daemon=True).start()
\ No newline at end of file
+        from . import signals  # noqa: F401
+        from .services.db_pool import pool_metric_lines
+        from .services.metrics import registry
+
+        registry.collectors.append(pool_metric_lines)
+
+        # Initial data is loaded by `manage.py bootstrap_data` or the
+        # credit_celery.bootstrap_data task, not at startup; /api/ready/
+        # reports when it has finished.
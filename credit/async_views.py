@@ -0,0 +1,134 @@
+# credit/async_views.py
+import asyncio
+import json
+
+from django.db.models import Sum
+from django.http import Http404, JsonResponse
+from django.shortcuts import aget_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from .models import Customer, Loan, LoanArchive
+from .services.credit_profile import aget_credit_profile
+from .services.policy import aget_policy
+
+# ==================================
+# Async API Endpoints (ASGI)
+# Same request/response contract as the sync views in views.py; independent
+# queries are issued concurrently with asyncio.gather.
+# ==================================
+
+
+def not_found(exc):
+    """JSON 404 in the shape DRF gives the sync views."""
+    return JsonResponse({"detail": str(exc)}, status=404)
+
+
+@csrf_exempt
+@require_POST
+async def check_eligibility(request):
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"error": "Request body must be a JSON object"}, status=400)
+
+    customer_id = data.get("customer_id")
+    loan_amount = data.get("loan_amount")
+    interest_rate = data.get("interest_rate")
+    tenure = data.get("tenure")
+
+    if not all([customer_id, loan_amount, interest_rate, tenure]):
+        return JsonResponse({"error": "All fields are required"}, status=400)
+
+    try:
+        customer_id = int(customer_id)
+        loan_amount = float(loan_amount)
+        interest_rate = float(interest_rate)
+        tenure = int(tenure)
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "Invalid data type"}, status=400)
+
+    try:
+        customer, profile, policy = await asyncio.gather(
+            aget_object_or_404(Customer, customer_id=customer_id),
+            aget_credit_profile(customer_id),
+            aget_policy(),
+        )
+    except Http404 as e:
+        # The sync view reports an unknown customer as a 400
+        return JsonResponse({"error": str(e)}, status=400)
+    approved, corrected_rate, monthly_installment = policy.evaluate(
+        customer, profile, loan_amount, interest_rate, tenure
+    )
+
+    return JsonResponse({
+        "customer_id": customer.customer_id,
+        "approval": approved,
+        "interest_rate": interest_rate,
+        "corrected_interest_rate": corrected_rate,
+        "tenure": tenure,
+        "monthly_installment": round(monthly_installment, 2)
+    })
+
+
+@require_GET
+async def view_loan(request, loan_id):
+    try:
+        loan = (
+            await Loan.objects.select_related("customer").filter(loan_id=loan_id).afirst()
+            or await aget_object_or_404(LoanArchive.objects.select_related("customer"), loan_id=loan_id)
+        )
+    except Http404 as e:
+        return not_found(e)
+    return JsonResponse({
+        "loan_id": loan.loan_id,
+        "customer": {
+            "id": loan.customer.customer_id,
+            "first_name": loan.customer.first_name,
+            "last_name": loan.customer.last_name,
+            "phone_number": loan.customer.phone_number,
+            "age": loan.customer.age
+        },
+        "loan_amount": loan.loan_amount,
+        "interest_rate": loan.interest_rate,
+        "monthly_installment": loan.monthly_repayment,
+        "tenure": loan.tenure
+    })
+
+
+@require_GET
+async def view_loans_by_customer(request, customer_id):
+    loans = Loan.objects.filter(customer__customer_id=customer_id)
+    archived = LoanArchive.objects.filter(customer__customer_id=customer_id).order_by("loan_id")
+
+    async def fetch(queryset):
+        return [loan async for loan in queryset]
+
+    # Full history: archived (closed) loans are listed after the live ones
+    try:
+        _, totals, live, closed = await asyncio.gather(
+            aget_object_or_404(Customer, customer_id=customer_id),
+            loans.filter(is_active=True).aaggregate(total=Sum("loan_amount")),
+            fetch(loans),
+            fetch(archived),
+        )
+    except Http404 as e:
+        return not_found(e)
+    rows = live + closed
+
+    result = [
+        {
+            "loan_id": l.loan_id,
+            "loan_amount": l.loan_amount,
+            "interest_rate": round(l.interest_rate, 2),
+            "monthly_installment": round(l.monthly_repayment, 2),
+            "tenure": l.tenure,
+            "repayments_left": max(0, l.tenure - l.emis_paid_on_time),
+            "start_date": l.start_date,
+            "end_date": l.end_date,
+            "is_active": l.is_active
+        } for l in rows
+    ]
+    return JsonResponse({"total_debt": totals["total"] or 0, "loans": result})
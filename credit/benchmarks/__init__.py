@@ -0,0 +1 @@
+"""Synthetic data and traffic replay for benchmarking the credit API (see manage.py benchmark_api)."""
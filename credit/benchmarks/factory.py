@@ -0,0 +1,97 @@
+# credit/benchmarks/factory.py
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from django.db.models import Max
+
+from credit.models import Customer, Loan
+from credit.services.emi import emi_array
+from credit.services.id_allocator import sync_id_sequences
+from credit.services.ingestion import IngestProgress, ingest_batches
+
+FIRST_NAMES = ["Aarav", "Diya", "Kabir", "Meera", "Rohan", "Sara", "Vivaan", "Isha", "Arjun", "Anaya"]
+LAST_NAMES = ["Sharma", "Iyer", "Khan", "Patel", "Reddy", "Gupta", "Das", "Nair", "Singh", "Bose"]
+INTEREST_RATES = np.array([8.0, 10.5, 12.0, 14.0, 16.0, 18.5])
+TENURES = np.array([6, 12, 24, 36, 48, 60, 120])
+
+
+def customer_frame(count, first_id, rng):
+    """A sheet shaped like static/customer_data.xlsx (same headers and value ranges)."""
+    ids = np.arange(first_id, first_id + count)
+    salary = rng.integers(15, 300, size=count) * 1000
+    return pd.DataFrame({
+        "Customer ID": ids,
+        "First Name": rng.choice(FIRST_NAMES, size=count),
+        "Last Name": rng.choice(LAST_NAMES, size=count),
+        "Age": rng.integers(21, 65, size=count),
+        "Phone Number": 9_000_000_000 + ids,
+        "Monthly Salary": salary,
+        "Approved Limit": np.round(36 * salary / 100000) * 100000,
+    })
+
+
+def loan_frame(customer_ids, loans_per_customer, first_id, rng, today=None):
+    """A sheet shaped like static/loan_data.xlsx for loans_per_customer loans each."""
+    today = today or date.today()
+    owners = np.repeat(np.asarray(customer_ids), loans_per_customer)
+    count = len(owners)
+
+    amount = rng.integers(1, 100, size=count) * 10000
+    rate = rng.choice(INTEREST_RATES, size=count)
+    tenure = rng.choice(TENURES, size=count)
+    # Start up to 8 years back; roughly a third of loans are still running
+    start_offset = rng.integers(0, 8 * 365, size=count)
+    start = pd.to_datetime(today) - pd.to_timedelta(start_offset, unit="D")
+    end = start + pd.to_timedelta(tenure * 30, unit="D")
+    elapsed = np.minimum(start_offset // 30, tenure)
+    paid_on_time = np.floor(elapsed * rng.uniform(0.6, 1.0, size=count)).astype(int)
+
+    return pd.DataFrame({
+        "Customer ID": owners,
+        "Loan ID": np.arange(first_id, first_id + count),
+        "Loan Amount": amount,
+        "Tenure": tenure,
+        "Interest Rate": rate,
+        "Monthly payment": np.round(emi_array(amount, rate, tenure)),
+        "EMIs paid on Time": paid_on_time,
+        "Date of Approval": start,
+        "End Date": end,
+    })
+
+
+def seed_book(customers, loans_per_customer, seed=0, batch_size=5000):
+    """
+    Write a synthetic book of customers x loans_per_customer loans through
+    the regular ingestion path, with IDs above everything already present.
+    Returns {"customer_ids": [...], "loan_ids": [...]}.
+    """
+    rng = np.random.default_rng(seed)
+    first_customer = (Customer.objects.aggregate(m=Max("customer_id"))["m"] or 0) + 1
+    first_loan = (Loan.objects.aggregate(m=Max("loan_id"))["m"] or 0) + 1
+
+    customer_ids = []
+    loan_ids = []
+    for start in range(0, customers, batch_size):
+        count = min(batch_size, customers - start)
+        sheet = customer_frame(count, first_customer + start, rng)
+        ingest_batches([sheet], "customers", batch_size, False, IngestProgress("customers"))
+        customer_ids.extend(sheet["Customer ID"].tolist())
+
+        if loans_per_customer:
+            loans = loan_frame(
+                sheet["Customer ID"], loans_per_customer, first_loan + len(loan_ids), rng
+            )
+            ingest_batches([loans], "loans", batch_size, False, IngestProgress("loans"))
+            loan_ids.extend(loans["Loan ID"].tolist())
+
+    sync_id_sequences()
+    return {"customer_ids": customer_ids, "loan_ids": loan_ids}
+
+
+def existing_book(limit=10000):
+    """Customer and loan IDs already in the database, for replaying without seeding."""
+    return {
+        "customer_ids": list(Customer.objects.values_list("customer_id", flat=True)[:limit]),
+        "loan_ids": list(Loan.objects.values_list("loan_id", flat=True)[:limit]),
+    }
@@ -0,0 +1,193 @@
+# credit/benchmarks/runner.py
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+# Relative weights of each endpoint in a replayed traffic mix
+TRAFFIC_MIXES = {
+    "mixed": {
+        "register": 5,
+        "check_eligibility": 40,
+        "create_loan": 10,
+        "view_loan": 25,
+        "customer_loans": 20,
+    },
+    "lookups": {
+        "check_eligibility": 50,
+        "view_loan": 30,
+        "customer_loans": 20,
+    },
+    "booking": {
+        "register": 20,
+        "check_eligibility": 30,
+        "create_loan": 50,
+    },
+}
+
+
+def build_request(endpoint, book, rng):
+    """(method, path, payload) for one request of the given endpoint."""
+    if endpoint == "register":
+        return "POST", "/api/register/", {
+            "first_name": "Bench",
+            "last_name": "Customer",
+            "age": rng.randint(21, 65),
+            "monthly_income": rng.randint(15, 300) * 1000,
+            "phone_number": f"7{uuid.uuid4().int % 10**9:09d}",
+        }
+    if endpoint in ("check_eligibility", "create_loan"):
+        path = "/api/check-eligibility/" if endpoint == "check_eligibility" else "/api/create-loan/"
+        return "POST", path, {
+            "customer_id": rng.choice(book["customer_ids"]),
+            "loan_amount": rng.randint(1, 50) * 10000,
+            "interest_rate": rng.choice([8, 10.5, 12, 14, 16]),
+            "tenure": rng.choice([6, 12, 24, 36]),
+        }
+    if endpoint == "view_loan":
+        return "GET", f"/api/loan/{rng.choice(book['loan_ids'])}/", None
+    if endpoint == "customer_loans":
+        return "GET", f"/api/customer/{rng.choice(book['customer_ids'])}/loans/", None
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+class InProcessTransport:
+    """Calls the app through django.test.Client and counts SQL queries per request."""
+
+    counts_queries = True
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def send(self, method, path, payload):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = Client()
+        with CaptureQueriesContext(connection) as queries:
+            if method == "GET":
+                response = client.get(path)
+            else:
+                response = client.post(path, data=json.dumps(payload), content_type="application/json")
+        return response.status_code, len(queries)
+
+    def close(self):
+        connection.close()
+
+
+class HttpTransport:
+    """Calls a running server over HTTP; query counts are not available."""
+
+    counts_queries = False
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def send(self, method, path, payload):
+        body = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=body,
+            method=method,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status, None
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+    def close(self):
+        pass
+
+
+def run_benchmark(transport, book, mix="mixed", requests=1000, concurrency=1, seed=0, warmup=50):
+    """
+    Replay `requests` requests drawn from a traffic mix and return per
+    endpoint latency percentiles, throughput, error counts and (in-process)
+    query counts. 4xx responses from business rules (e.g. loan not
+    approved) count as successes; 5xx and transport failures as errors.
+    """
+    weights = TRAFFIC_MIXES[mix]
+    rng = random.Random(seed)
+    endpoints = rng.choices(list(weights), weights=list(weights.values()), k=warmup + requests)
+    plan = [(endpoint, *build_request(endpoint, book, rng)) for endpoint in endpoints]
+
+    def call(item):
+        endpoint, method, path, payload = item
+        started = time.perf_counter()
+        try:
+            status, queries = transport.send(method, path, payload)
+        except Exception:
+            status, queries = None, None
+        return endpoint, time.perf_counter() - started, status, queries
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, plan[:warmup]))
+        started = time.perf_counter()
+        results = list(pool.map(call, plan[warmup:]))
+        wall = time.perf_counter() - started
+        # Each worker thread holds its own DB connection
+        list(pool.map(lambda _: transport.close(), range(concurrency)))
+
+    return summarize(results, wall, transport.counts_queries)
+
+
+def summarize(results, wall, counts_queries):
+    by_endpoint = {}
+    for endpoint, seconds, status, queries in results:
+        by_endpoint.setdefault(endpoint, []).append((seconds, status, queries))
+
+    report = {
+        "requests": len(results),
+        "seconds": round(wall, 3),
+        "throughput_rps": round(len(results) / wall, 1) if wall else None,
+        "endpoints": {},
+    }
+    for endpoint, samples in sorted(by_endpoint.items()):
+        latencies_ms = np.array([seconds for seconds, _, _ in samples]) * 1000
+        errors = sum(1 for _, status, _ in samples if status is None or status >= 500)
+        p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+        stats = {
+            "count": len(samples),
+            "errors": errors,
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "mean_ms": round(float(latencies_ms.mean()), 2),
+            "throughput_rps": round(len(samples) / wall, 1) if wall else None,
+        }
+        if counts_queries:
+            queries = [q for _, _, q in samples if q is not None]
+            stats["queries_mean"] = round(sum(queries) / len(queries), 2) if queries else None
+            stats["queries_max"] = max(queries) if queries else None
+        report["endpoints"][endpoint] = stats
+    return report
+
+
+def compare_reports(baseline, current, tolerance=0.2):
+    """
+    Regressions of current against a baseline report: p95 latency more than
+    `tolerance` slower, or more queries per request. Returns messages.
+    """
+    regressions = []
+    for endpoint, stats in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if not before:
+            continue
+        if stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p95 {before['p95_ms']}ms -> {stats['p95_ms']}ms")
+        queries_before, queries_now = before.get("queries_max"), stats.get("queries_max")
+        if queries_before is not None and queries_now is not None and queries_now > queries_before:
+            regressions.append(f"{endpoint}: queries {before['queries_max']} -> {stats['queries_max']}")
+    return regressions
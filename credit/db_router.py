@@ -0,0 +1,129 @@
+# credit/db_router.py
+import contextvars
+import functools
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+# True inside replica_reads(): reads may be served by a replica
+_replica_reads = contextvars.ContextVar("credit_replica_reads", default=False)
+
+
+def replica_aliases():
+    return getattr(settings, "CREDIT_REPLICA_ALIASES", [])
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes, migrations and ordinary reads go to the primary. Reads run
+    inside replica_reads() are spread over CREDIT_REPLICA_ALIASES.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            aliases = replica_aliases()
+            if aliases:
+                return random.choice(aliases)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Streaming replicas get their schema from the primary; a local SQLite
+        # stand-in (DB_REPLICA_SQLITE) is migrated and loaded on its own
+        if db == DEFAULT_DB_ALIAS:
+            return True
+        return settings.DATABASES[db]["ENGINE"].endswith("sqlite3")
+
+
+# ========================
+# Read-your-writes pins
+# ========================
+def _pin_key(kind, value):
+    return f"credit:db:pin:{kind}:{value}"
+
+
+def pin_to_primary(**ids):
+    """
+    Keep reads about these objects (e.g. customer=..., loan=...) on the
+    primary for CREDIT_REPLICA_PIN_SECONDS, longer than replication lag.
+    """
+    if not replica_aliases():
+        return
+    timeout = getattr(settings, "CREDIT_REPLICA_PIN_SECONDS", 5)
+    cache.set_many({_pin_key(kind, value): 1 for kind, value in ids.items()}, timeout)
+
+
+def is_pinned(**ids):
+    ids = {kind: value for kind, value in ids.items() if value is not None}
+    if not ids:
+        return False
+    try:
+        return bool(cache.get_many([_pin_key(kind, value) for kind, value in ids.items()]))
+    except Exception:
+        # Without the pin store we cannot promise read-your-writes
+        return True
+
+
+class use_replicas:
+    """Context manager: reads inside the block may go to a replica."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+
+    def __enter__(self):
+        self._token = _replica_reads.set(self.enabled)
+        return self
+
+    def __exit__(self, *exc):
+        _replica_reads.reset(self._token)
+
+
+def replica_reads(pins=None):
+    """
+    View decorator routing the view's reads to replicas. `pins` maps the
+    view's arguments to pin ids, e.g. lambda request, loan_id: {"loan": loan_id};
+    pinned (recently written) objects are read from the primary instead.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not replica_aliases():
+                return view(request, *args, **kwargs)
+            pinned = pins is not None and is_pinned(**pins(request, *args, **kwargs))
+            with use_replicas(not pinned):
+                return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class ReplicaReadMixin:
+    """
+    DRF viewset mixin: actions listed in replica_actions read from replicas.
+    The routing flag is set in initial() and cleared in finalize_response(),
+    which DRF calls on every path out of dispatch().
+    """
+
+    replica_actions = ()
+
+    def initial(self, request, *args, **kwargs):
+        if self.action in self.replica_actions and replica_aliases():
+            self._replica_token = _replica_reads.set(True)
+        super().initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_token", None)
+        if token is not None:
+            _replica_reads.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,30 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from credit.services.archive import archivable_loans, archive_closed_loans, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = "Move inactive loans past their end date into the partitioned archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            type=date.fromisoformat,
+            help="Archive loans that ended before this date (default: today - CREDIT_ARCHIVE_AFTER_DAYS).",
+        )
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument("--limit", type=int, help="Stop after this many loans.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count archivable loans.")
+
+    def handle(self, *args, **options):
+        cutoff = options["before"] or archive_cutoff()
+
+        if options["dry_run"]:
+            count = archivable_loans(cutoff).count()
+            self.stdout.write(f"{count} loans ended before {cutoff} and can be archived")
+            return
+
+        archived = archive_closed_loans(cutoff, options["batch_size"], options["limit"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} loans that ended before {cutoff}"))
@@ -0,0 +1,80 @@
+import json
+import platform
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from credit.benchmarks.factory import existing_book, seed_book
+from credit.benchmarks.runner import (
+    TRAFFIC_MIXES,
+    HttpTransport,
+    InProcessTransport,
+    compare_reports,
+    run_benchmark,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic book and replay a traffic mix against the API, in-process "
+        "or against --url, reporting p50/p95/p99 latency, throughput and query counts "
+        "per endpoint as JSON. Writes data: run against a disposable database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=1000)
+        parser.add_argument("--loans-per-customer", type=int, default=5)
+        parser.add_argument("--skip-seed", action="store_true", help="Replay against the data already loaded.")
+        parser.add_argument("--mix", choices=sorted(TRAFFIC_MIXES), default="mixed")
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=1)
+        parser.add_argument("--warmup", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--url", help="Base URL of a running server, e.g. http://127.0.0.1:8000")
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument("--baseline", help="Fail if the run regresses against this earlier report.")
+        parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 slowdown vs the baseline.")
+
+    def handle(self, *args, **options):
+        if options["skip_seed"]:
+            book = existing_book()
+        else:
+            self.stdout.write(
+                f"Seeding {options['customers']} customers x {options['loans_per_customer']} loans"
+            )
+            book = seed_book(options["customers"], options["loans_per_customer"], options["seed"])
+        if not book["customer_ids"] or not book["loan_ids"]:
+            raise CommandError("No customers or loans to replay against")
+
+        transport = HttpTransport(options["url"]) if options["url"] else InProcessTransport()
+        report = run_benchmark(
+            transport,
+            book,
+            mix=options["mix"],
+            requests=options["requests"],
+            concurrency=options["concurrency"],
+            seed=options["seed"],
+            warmup=options["warmup"],
+        )
+        report["meta"] = {
+            "mix": options["mix"],
+            "transport": options["url"] or "in-process",
+            "concurrency": options["concurrency"],
+            "customers": len(book["customer_ids"]),
+            "python": platform.python_version(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            Path(options["output"]).write_text(output)
+            self.stdout.write(f"Report written to {options['output']}")
+        self.stdout.write(output)
+
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text())
+            regressions = compare_reports(baseline, report, options["tolerance"])
+            if regressions:
+                raise CommandError("Regressions: " + "; ".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
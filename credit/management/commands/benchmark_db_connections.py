@@ -0,0 +1,85 @@
+import json
+import time
+
+import numpy as np
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+
+from credit.models import Customer
+from credit.services.db_pool import pool_mode, pool_stats
+
+
+def _percentiles(samples):
+    p50, p95, p99 = np.percentile(np.array(samples) * 1000, [50, 95, 99])
+    return {"p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3)}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what connection setup costs: a query on a fresh connection vs a "
+        "reused one, then check-eligibility requests under the configured "
+        "DB_POOL_MODE. Run once per mode to compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--customer-id", type=int, help="Customer for the eligibility requests.")
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        report = {"mode": pool_mode()}
+
+        def timed_query(reconnect):
+            samples = []
+            for _ in range(iterations):
+                if reconnect:
+                    connection.close()
+                started = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+                samples.append(time.perf_counter() - started)
+            return _percentiles(samples)
+
+        # With a pool, close() hands the connection back instead of dropping it
+        report["query_new_connection"] = timed_query(reconnect=True)
+        report["query_reused_connection"] = timed_query(reconnect=False)
+
+        customer_id = options["customer_id"] or Customer.objects.values_list("customer_id", flat=True).first()
+        if customer_id is not None:
+            opened = []
+
+            def count_connection(sender, connection, **kwargs):
+                opened.append(connection.alias)
+
+            connection_created.connect(count_connection)
+            try:
+                # The real WSGI handler, not the test Client: the Client disconnects
+                # close_old_connections, so every mode would reuse one connection
+                handler = WSGIHandler()
+                factory = RequestFactory()
+                payload = json.dumps({
+                    "customer_id": customer_id, "loan_amount": 100000, "interest_rate": 12, "tenure": 12,
+                })
+                samples = []
+                for _ in range(iterations):
+                    environ = factory.post(
+                        "/api/check-eligibility/", data=payload, content_type="application/json"
+                    ).environ
+                    started = time.perf_counter()
+                    response = handler(environ, lambda status, headers, exc_info=None: None)
+                    b"".join(response)
+                    response.close()  # request_finished: release or close the connection
+                    samples.append(time.perf_counter() - started)
+            finally:
+                connection_created.disconnect(count_connection)
+            report["check_eligibility"] = {**_percentiles(samples), "connections_opened": len(opened)}
+
+        stats = pool_stats()
+        if stats:
+            report["pool"] = stats
+
+        self.stdout.write(json.dumps(report, indent=2))
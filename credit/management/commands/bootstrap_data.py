@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from credit.services.bootstrap import BootstrapBusy, run_bootstrap
+
+
+class Command(BaseCommand):
+    help = (
+        "Load the initial customer and loan data once. Guarded by an advisory "
+        "lock and skipped when the source files are already loaded at their "
+        "current version."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Reload every row even if already loaded.")
+        parser.add_argument(
+            "--wait",
+            action="store_true",
+            help="Wait for a concurrent bootstrap to finish instead of exiting.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = run_bootstrap(force=options["force"], wait=options["wait"])
+        except BootstrapBusy as e:
+            self.stdout.write(self.style.WARNING(str(e)))
+            return
+        except FileNotFoundError as e:
+            raise CommandError(f"Source file missing: {e.filename}")
+
+        if result["skipped"]:
+            self.stdout.write(self.style.SUCCESS("Initial data already loaded at the current version"))
+            return
+        self.stdout.write(json.dumps(
+            {kind: result[kind] for kind in ("customers", "loans")}, indent=2, default=str
+        ))
+        self.stdout.write(self.style.SUCCESS("Initial data loaded"))
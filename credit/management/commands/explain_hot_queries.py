@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from credit.services.query_plans import explain_hot_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the hot loan/customer queries and check they use the tuned "
+        "indexes, with index-only scans for the active-debt sums."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--analyze", action="store_true", help="ANALYZE tables and run EXPLAIN ANALYZE.")
+        parser.add_argument(
+            "--no-seqscan",
+            action="store_true",
+            help="Disable sequential scans so small tables still show whether the index is usable.",
+        )
+        parser.add_argument("--verbose-plans", action="store_true", help="Print every plan, not only failures.")
+
+    def handle(self, *args, **options):
+        try:
+            results = explain_hot_queries(options["analyze"], options["no_seqscan"])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        failures = 0
+        for result in results:
+            if result["ok"]:
+                scan = "index-only" if result["index_only"] else "index"
+                self.stdout.write(self.style.SUCCESS(f"OK   {result['name']} ({result['index']}, {scan})"))
+            else:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f"FAIL {result['name']} (expected {result['index']})"))
+            if options["verbose_plans"] or not result["ok"]:
+                self.stdout.write(result["plan"])
+
+        if failures:
+            raise CommandError(
+                f"{failures} hot queries do not use their index "
+                "(on small tables retry with --no-seqscan; index-only scans need a vacuumed table)"
+            )
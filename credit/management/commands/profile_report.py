@@ -0,0 +1,60 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from credit.services.profiling import FUNCTION_GROUPS, aggregate_profiles, load_profiles, profile_dir
+
+
+class Command(BaseCommand):
+    help = "Aggregate captured request profiles into the top-N hot functions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", help="Profile directory (default CREDIT_PROFILE_DIR).")
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument(
+            "--only",
+            action="append",
+            choices=sorted(FUNCTION_GROUPS),
+            default=[],
+            help="Restrict to functions in these module groups (repeatable).",
+        )
+        parser.add_argument("--url-name", help="Only profiles of this URL name.")
+        parser.add_argument("--since", help="Only profiles captured at or after this ISO timestamp.")
+        parser.add_argument("--slow-only", action="store_true", help="Ignore randomly sampled captures.")
+        parser.add_argument("--json", action="store_true", help="Print the raw JSON report.")
+
+    def handle(self, *args, **options):
+        directory = options["dir"] or profile_dir()
+        try:
+            profiles = load_profiles(directory, options["since"])
+        except FileNotFoundError:
+            raise CommandError(f"No profile directory at {directory}")
+        if options["url_name"]:
+            profiles = [p for p in profiles if p.get("url_name") == options["url_name"]]
+        if options["slow_only"]:
+            profiles = [p for p in profiles if p.get("reason") == "slow"]
+        if not profiles:
+            raise CommandError("No matching profiles")
+
+        report = aggregate_profiles(profiles, options["top"], options["only"])
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        durations = sorted(p["duration_ms"] for p in profiles)
+        self.stdout.write(
+            f"{len(profiles)} profiles, median {durations[len(durations) // 2]} ms, "
+            f"max {durations[-1]} ms"
+        )
+        if "cprofile" in report:
+            self.stdout.write("\ncProfile (cumulative seconds across captures):")
+            for row in report["cprofile"]:
+                self.stdout.write(
+                    f"{row['cumtime_s']:>10.4f} {row['tottime_s']:>10.4f} {row['calls']:>8}  {row['function']}"
+                )
+        if "sampled" in report:
+            self.stdout.write(f"\nSampled stacks ({report['sampled']['samples']} samples, inclusive / self %):")
+            for row in report["sampled"]["functions"]:
+                self.stdout.write(
+                    f"{row['inclusive_pct']:>7.2f} {row['self_pct']:>7.2f}  {row['function']}"
+                )
@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+
+from credit.models import CreditPolicy
+from credit.services.policy import compile_policy
+
+
+class Command(BaseCommand):
+    help = "Validate a credit policy file (JSON or YAML) and publish it as the next active version."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--description", default="")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only validate and compile the file.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"{path} not found")
+
+        if path.suffix.lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise CommandError("PyYAML is required for YAML policy files")
+            config = yaml.safe_load(path.read_text())
+        else:
+            config = json.loads(path.read_text())
+
+        try:
+            compiled = compile_policy(config)
+        except (TypeError, ValueError) as e:
+            raise CommandError(f"Invalid policy: {e}")
+
+        self.stdout.write(f"Slabs: {compiled.slabs}")
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS("Policy is valid"))
+            return
+
+        version = (CreditPolicy.objects.aggregate(v=Max("version"))["v"] or 0) + 1
+        CreditPolicy.objects.create(
+            version=version,
+            config=config,
+            description=options["description"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Published credit policy v{version}"))
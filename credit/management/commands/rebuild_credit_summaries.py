@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from credit.services.credit_summary import rebuild_summaries, verify_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild CustomerCreditSummary rows from the loan table and verify them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify-only",
+            action="store_true",
+            help="Only report drift, do not rewrite summaries.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if not options["verify_only"]:
+            written = rebuild_summaries(batch_size=batch_size)
+            self.stdout.write(f"Rebuilt {written} customer summaries")
+
+        drift = verify_summaries(batch_size=batch_size)
+        for customer_pk, field, stored, expected in drift[:50]:
+            self.stdout.write(
+                f"Customer pk={customer_pk}: {field} stored={stored} expected={expected}"
+            )
+
+        if drift:
+            raise CommandError(f"{len(drift)} summary fields out of sync")
+        self.stdout.write(self.style.SUCCESS("Credit summaries are in sync"))
@@ -0,0 +1,23 @@
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from credit.services.scores import snapshot_scores
+
+
+class Command(BaseCommand):
+    help = "Write today's credit score snapshot, rescoring only customers changed since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Rescore every customer.")
+        parser.add_argument("--date", type=date.fromisoformat, help="Snapshot date (default: today).")
+        parser.add_argument("--batch-size", type=int)
+
+    def handle(self, *args, **options):
+        result = snapshot_scores(
+            snapshot_date=options["date"],
+            full=options["full"],
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(json.dumps(result, indent=2))
@@ -0,0 +1,95 @@
+import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from credit.models import Customer, Loan
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire parallel create-loan requests at one customer and check that "
+        "debt updates are not lost, limits hold and idempotency keys are honoured. "
+        "Books real loans: run against a disposable database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("customer_id", type=int)
+        parser.add_argument("--requests", type=int, default=20)
+        parser.add_argument("--workers", type=int, default=10)
+        parser.add_argument("--loan-amount", type=float, default=10000)
+        parser.add_argument("--interest-rate", type=float, default=14)
+        parser.add_argument("--tenure", type=int, default=12)
+
+    def handle(self, *args, **options):
+        customer = Customer.objects.filter(customer_id=options["customer_id"]).first()
+        if customer is None:
+            raise CommandError(f"Customer {options['customer_id']} not found")
+
+        debt_before = customer.current_debt
+        loans_before = set(customer.loans.values_list("loan_id", flat=True))
+        payload = json.dumps({
+            "customer_id": customer.customer_id,
+            "loan_amount": options["loan_amount"],
+            "interest_rate": options["interest_rate"],
+            "tenure": options["tenure"],
+        })
+        barrier = threading.Barrier(options["workers"])
+
+        def book(idempotency_key):
+            # Line the workers up so their transactions actually overlap
+            try:
+                barrier.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+            try:
+                response = Client().post(
+                    "/api/create-loan/",
+                    data=payload,
+                    content_type="application/json",
+                    HTTP_IDEMPOTENCY_KEY=idempotency_key,
+                )
+                return response.status_code, response.json()
+            finally:
+                connection.close()
+
+        # Every key is sent twice: a retry must not book a second loan
+        keys = [str(uuid.uuid4()) for _ in range(options["requests"])]
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            results = list(pool.map(book, keys + keys))
+
+        customer.refresh_from_db()
+        new_loans = Loan.objects.filter(customer=customer).exclude(loan_id__in=loans_before)
+        booked = {body["loan_id"] for status, body in results if status == 200}
+        errors = [(status, body) for status, body in results if status not in (200, 400)]
+
+        failures = []
+        if errors:
+            failures.append(f"{len(errors)} unexpected responses, e.g. {errors[0]}")
+        if booked != set(new_loans.values_list("loan_id", flat=True)):
+            failures.append("booked loan IDs do not match the loans in the database")
+        # The retry of every key must replay the first answer verbatim
+        mismatched = [
+            key for key, first, retry in zip(keys, results, results[len(keys):])
+            if first != retry
+        ]
+        if mismatched:
+            failures.append(
+                f"{len(mismatched)} idempotency keys got different responses "
+                f"(e.g. {mismatched[0]}): duplicate booking or lost replay"
+            )
+        expected_debt = debt_before + sum(int(l.loan_amount) for l in new_loans)
+        if customer.current_debt != expected_debt:
+            failures.append(f"current_debt {customer.current_debt} != expected {expected_debt}")
+
+        self.stdout.write(
+            f"{len(results)} requests, {len(booked)} loans booked, "
+            f"current_debt {debt_before} -> {customer.current_debt}"
+        )
+        if failures:
+            raise CommandError("; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("No lost updates or duplicate bookings"))
@@ -0,0 +1,136 @@
+# credit/middleware.py
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from credit.services import profiling
+from credit.services.metrics import (
+    begin_request,
+    current_timings,
+    end_request,
+    query_recorder,
+    registry,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """
+    Per-request SQL query count, DB time, serializer / eligibility / EMI
+    time and total time, recorded into the /metrics histograms by URL name
+    and reported in a Server-Timing header. Enabled by CREDIT_METRICS_ENABLED.
+
+    Queries run by async views in other threads (sync_to_async) are not
+    attributed to the request.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "CREDIT_METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "CREDIT_METRICS_SERVER_TIMING", True)
+
+    def __call__(self, request):
+        timings, token = begin_request()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(query_recorder(timings)))
+                response = self.get_response(request)
+        finally:
+            end_request(token)
+        total = time.perf_counter() - started
+
+        # Time not spent in SQL or serialization
+        timings.phases["view"] = max(
+            total - timings.db_seconds - timings.phases.get("serializer", 0.0), 0.0
+        )
+        match = request.resolver_match
+        url_name = match.url_name if match and match.url_name else "unmatched"
+        registry.observe(url_name, request.method, response.status_code, total, timings)
+
+        if self.server_timing:
+            entries = [f'db;dur={timings.db_seconds * 1000:.2f};desc="{timings.queries} queries"']
+            entries += [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in timings.phases.items()]
+            entries.append(f"total;dur={total * 1000:.2f}")
+            response["Server-Timing"] = ", ".join(entries)
+        return response
+
+
+class RequestProfilerMiddleware:
+    """
+    Opt-in profiling of the slow tail (CREDIT_PROFILING_ENABLED). Requests
+    under CREDIT_PROFILE_PATH_PREFIX are profiled; the capture is kept when
+    the request took at least CREDIT_PROFILE_THRESHOLD_MS or was picked by
+    CREDIT_PROFILE_SAMPLE_RATE, and written to CREDIT_PROFILE_DIR with its
+    request metadata. manage.py profile_report aggregates the captures.
+
+    CREDIT_PROFILE_MODE "sampling" (default) snapshots stacks from a
+    background thread and is cheap enough to leave on; "cprofile" traces
+    every call, is much slower, and profiles one request at a time.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "CREDIT_PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.mode = getattr(settings, "CREDIT_PROFILE_MODE", "sampling")
+        self.prefix = getattr(settings, "CREDIT_PROFILE_PATH_PREFIX", "/api/")
+        self.threshold = getattr(settings, "CREDIT_PROFILE_THRESHOLD_MS", 500) / 1000
+        self.sample_rate = getattr(settings, "CREDIT_PROFILE_SAMPLE_RATE", 0.01)
+
+    def __call__(self, request):
+        if not request.path.startswith(self.prefix):
+            return self.get_response(request)
+
+        profiler = stacks = None
+        thread_id = threading.get_ident()
+        if self.mode == "cprofile":
+            if not profiling.cprofile_lock.acquire(blocking=False):
+                return self.get_response(request)
+            profiler = profiling.new_cprofile()
+        else:
+            sampler = profiling.get_sampler()
+            sampler.start(thread_id)
+
+        started = time.perf_counter()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            response = self.get_response(request)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiling.cprofile_lock.release()
+            else:
+                stacks = sampler.stop(thread_id)
+        duration = time.perf_counter() - started
+
+        slow = duration >= self.threshold
+        if slow or random.random() < self.sample_rate:
+            match = request.resolver_match
+            timings = current_timings()
+            meta = {
+                "method": request.method,
+                "path": request.path,
+                "query_string": request.META.get("QUERY_STRING", ""),
+                "url_name": match.url_name if match else None,
+                "status": response.status_code,
+                "duration_ms": round(duration * 1000, 2),
+                "reason": "slow" if slow else "sampled",
+                "mode": self.mode,
+                "queries": timings.queries if timings else None,
+            }
+            try:
+                profiling.save_profile(meta, profiler=profiler, stacks=stacks)
+            except OSError:
+                logger.warning("Could not store request profile", exc_info=True)
+        return response
@@ -0,0 +1,24 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit', '0002_alter_customer_customer_id_alter_loan_loan_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerCreditSummary',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='credit_summary', serialize=False, to='credit.customer')),
+                ('active_debt', models.PositiveBigIntegerField(default=0, help_text='Sum of loan_amount over active loans')),
+                ('active_emi_total', models.FloatField(default=0.0, help_text='Sum of monthly_repayment over active loans')),
+                ('loan_count', models.PositiveIntegerField(default=0)),
+                ('on_time_emis', models.PositiveIntegerField(default=0, help_text='Sum of emis_paid_on_time over all loans')),
+                ('loans_per_year', models.JSONField(default=dict, help_text='Number of loans keyed by start_date year')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
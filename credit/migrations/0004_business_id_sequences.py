@@ -0,0 +1,42 @@
+from django.db import migrations
+
+SEQUENCES = [
+    ("credit_customer", "customer_id", "credit_customer_business_id_seq"),
+    ("credit_loan", "loan_id", "credit_loan_business_id_seq"),
+]
+
+
+def create_sequences(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        for table, column, sequence in SEQUENCES:
+            cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {sequence}")
+            # Next nextval() returns MAX(column) + 1
+            cursor.execute(
+                f"SELECT setval(%s, COALESCE((SELECT MAX({column}) FROM {table}), 0) + 1, false)",
+                [sequence],
+            )
+
+
+def drop_sequences(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        for _, _, sequence in SEQUENCES:
+            cursor.execute(f"DROP SEQUENCE IF EXISTS {sequence}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit', '0003_customercreditsummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sequences, drop_sequences),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit', '0004_business_id_sequences'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestedFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(help_text='customers or loans', max_length=20)),
+                ('sha256', models.CharField(max_length=64)),
+                ('path', models.CharField(max_length=500)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('ingested_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'sha256'), name='unique_ingested_file')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RowFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(help_text='customers or loans', max_length=20)),
+                ('business_id', models.PositiveBigIntegerField()),
+                ('row_hash', models.BigIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'business_id'), name='unique_row_fingerprint')],
+            },
+        ),
+    ]
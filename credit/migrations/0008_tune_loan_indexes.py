@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit', '0007_creditpolicy'),
+    ]
+
+    operations = [
+        # Duplicates of the unique constraints on customer_id, phone_number and loan_id
+        migrations.RemoveIndex(
+            model_name='customer',
+            name='credit_cust_custome_da87b3_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='customer',
+            name='credit_cust_phone_n_8d7b46_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='loan',
+            name='credit_loan_loan_id_9cb7b6_idx',
+        ),
+        # Superseded by the partial covering index below
+        migrations.RemoveIndex(
+            model_name='loan',
+            name='credit_loan_custome_24f6ea_idx',
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['customer'], include=('loan_amount', 'monthly_repayment'), name='loan_active_cover_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(condition=models.Q(('emis_paid_on_time__lt', models.F('tenure'))), fields=['-start_date', '-loan_id'], name='loan_late_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['-start_date', '-loan_id'], name='loan_start_loan_id_idx'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Range-partitioned by start_date; the primary key has to include the
+# partition key, so the database key is (id, start_date) while Django
+# treats id alone as the primary key.
+POSTGRES_TABLE = """
+CREATE TABLE credit_loanarchive (
+    id bigint NOT NULL,
+    loan_id integer NOT NULL CHECK (loan_id >= 0),
+    customer_id bigint NOT NULL
+        REFERENCES credit_customer (id) DEFERRABLE INITIALLY DEFERRED,
+    loan_amount integer NOT NULL CHECK (loan_amount >= 0),
+    tenure integer NOT NULL CHECK (tenure >= 0),
+    interest_rate double precision NOT NULL,
+    monthly_repayment double precision NOT NULL,
+    emis_paid_on_time integer NOT NULL CHECK (emis_paid_on_time >= 0),
+    start_date date NOT NULL,
+    end_date date NOT NULL,
+    is_active boolean NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    archived_at timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, start_date)
+) PARTITION BY RANGE (start_date)
+"""
+
+
+def create_archive_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        schema_editor.create_model(apps.get_model("credit", "LoanArchive"))
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRES_TABLE)
+        # Catches rows outside every yearly partition; yearly partitions are
+        # created ahead of each archive run (credit.services.archive)
+        cursor.execute("CREATE TABLE credit_loanarchive_default PARTITION OF credit_loanarchive DEFAULT")
+        cursor.execute("CREATE INDEX loan_archive_loan_id_idx ON credit_loanarchive (loan_id)")
+        cursor.execute("CREATE INDEX loan_archive_customer_idx ON credit_loanarchive (customer_id)")
+
+
+def drop_archive_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        schema_editor.delete_model(apps.get_model("credit", "LoanArchive"))
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS credit_loanarchive CASCADE")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit', '0008_tune_loan_indexes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='LoanArchive',
+                    fields=[
+                        ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                        ('loan_id', models.PositiveIntegerField()),
+                        ('loan_amount', models.PositiveIntegerField()),
+                        ('tenure', models.PositiveIntegerField()),
+                        ('interest_rate', models.FloatField()),
+                        ('monthly_repayment', models.FloatField()),
+                        ('emis_paid_on_time', models.PositiveIntegerField(default=0)),
+                        ('start_date', models.DateField()),
+                        ('end_date', models.DateField()),
+                        ('is_active', models.BooleanField(default=False)),
+                        ('created_at', models.DateTimeField()),
+                        ('archived_at', models.DateTimeField(auto_now_add=True)),
+                        ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_loans', to='credit.customer')),
+                    ],
+                    options={
+                        'ordering': ['-start_date'],
+                        'indexes': [models.Index(fields=['loan_id'], name='loan_archive_loan_id_idx')],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_archive_table, drop_archive_table),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit', '0009_loanarchive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=50, unique=True)),
+                ('payload', models.JSONField()),
+                ('watermark', models.CharField(help_text='State of the book the payload was computed from', max_length=100)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
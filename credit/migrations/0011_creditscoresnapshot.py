@@ -0,0 +1,28 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit', '0010_portfoliosnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CreditScoreSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot_date', models.DateField()),
+                ('score', models.FloatField()),
+                ('slab', models.CharField(help_text='Approval slab the score falls in', max_length=20)),
+                ('policy_version', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField(help_text='Start of the run that computed the score')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_snapshots', to='credit.customer')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('customer', 'snapshot_date'), name='unique_customer_score_date')],
+                'indexes': [models.Index(fields=['snapshot_date', '-score'], name='score_snapshot_rank_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+def backfill_empty_summaries(apps, schema_editor):
+    """
+    Give customers without any loans an empty summary row; customers that
+    have loans but no row are left for rebuild_credit_summaries.
+    """
+    Customer = apps.get_model("credit", "Customer")
+    CustomerCreditSummary = apps.get_model("credit", "CustomerCreditSummary")
+
+    pks = (
+        Customer.objects.filter(
+            credit_summary__isnull=True,
+            loans__isnull=True,
+            archived_loans__isnull=True,
+        )
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    batch = []
+    for pk in pks.iterator(chunk_size=5000):
+        batch.append(CustomerCreditSummary(customer_id=pk, loans_per_year={}))
+        if len(batch) >= 5000:
+            CustomerCreditSummary.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        CustomerCreditSummary.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credit', '0011_creditscoresnapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_empty_summaries, migrations.RunPython.noop),
+    ]
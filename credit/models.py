@@ -1,12 +1,13 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Max
+
+from credit.services.id_allocator import customer_ids, loan_ids
 
 
 class Customer(models.Model):
     """
     Internal primary key: id (auto by Django)
-    Business ID: customer_id (auto-generated sequential)
+    Business ID: customer_id (allocated from a database sequence)
     """
 
     customer_id = models.PositiveIntegerField(
@@ -43,19 +44,12 @@ class Customer(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        indexes = [
-            models.Index(fields=["customer_id"]),
-            models.Index(fields=["phone_number"]),
-        ]
+        # customer_id and phone_number are already indexed by their unique constraints
         ordering = ["customer_id"]
 
     def save(self, *args, **kwargs):
         if not self.customer_id:
-            last_id = Customer.objects.aggregate(
-                max_id=Max("customer_id")
-            )["max_id"]
-
-            self.customer_id = 1 if last_id is None else last_id + 1
+            self.customer_id = customer_ids.next_id()
 
         super().save(*args, **kwargs)
 
@@ -63,10 +57,52 @@ class Customer(models.Model):
         return f"{self.customer_id} - {self.first_name} {self.last_name}"
 
 
+class CustomerCreditSummary(models.Model):
+    """
+    Denormalized loan aggregates for one customer.
+    Kept in step with every Loan write so scoring reads a single row.
+    Every customer has one; it is created empty alongside the customer.
+    """
+
+    customer = models.OneToOneField(
+        Customer,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="credit_summary"
+    )
+
+    active_debt = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Sum of loan_amount over active loans"
+    )
+
+    active_emi_total = models.FloatField(
+        default=0.0,
+        help_text="Sum of monthly_repayment over active loans"
+    )
+
+    loan_count = models.PositiveIntegerField(default=0)
+
+    on_time_emis = models.PositiveIntegerField(
+        default=0,
+        help_text="Sum of emis_paid_on_time over all loans"
+    )
+
+    loans_per_year = models.JSONField(
+        default=dict,
+        help_text="Number of loans keyed by start_date year"
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Summary | Customer {self.customer_id}"
+
+
 class Loan(models.Model):
     """
     Internal primary key: id (auto by Django)
-    Business ID: loan_id (auto-generated sequential)
+    Business ID: loan_id (allocated from a database sequence)
     """
 
     loan_id = models.PositiveIntegerField(
@@ -116,20 +152,203 @@ class Loan(models.Model):
 
     class Meta:
         indexes = [
-            models.Index(fields=["loan_id"]),
-            models.Index(fields=["customer", "is_active"]),
+            # Per-customer active debt / EMI sums as index-only scans
+            models.Index(
+                fields=["customer"],
+                include=["loan_amount", "monthly_repayment"],
+                condition=models.Q(is_active=True),
+                name="loan_active_cover_idx",
+            ),
+            # late_loans listing in cursor order
+            models.Index(
+                fields=["-start_date", "-loan_id"],
+                condition=models.Q(emis_paid_on_time__lt=models.F("tenure")),
+                name="loan_late_start_idx",
+            ),
+            # Default ordering and cursor pagination
+            models.Index(fields=["-start_date", "-loan_id"], name="loan_start_loan_id_idx"),
         ]
         ordering = ["-start_date"]
 
     def save(self, *args, **kwargs):
         if not self.loan_id:
-            last_id = Loan.objects.aggregate(
-                max_id=Max("loan_id")
-            )["max_id"]
-
-            self.loan_id = 1 if last_id is None else last_id + 1
+            self.loan_id = loan_ids.next_id()
 
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"Loan {self.loan_id} | Customer {self.customer.customer_id}"
\ No newline at end of file
+        return f"Loan {self.loan_id} | Customer {self.customer.customer_id}"
+
+
+class LoanArchive(models.Model):
+    """
+    Closed loans moved out of the live Loan table by
+    credit.services.archive. On PostgreSQL the table is range-partitioned
+    by start_date year. id keeps the original Loan primary key; loan_id
+    stays unique because business IDs are never reused.
+    Archived loans still count towards CustomerCreditSummary.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    loan_id = models.PositiveIntegerField()
+
+    customer = models.ForeignKey(
+        Customer,
+        on_delete=models.CASCADE,
+        related_name="archived_loans"
+    )
+
+    loan_amount = models.PositiveIntegerField()
+    tenure = models.PositiveIntegerField()
+    interest_rate = models.FloatField()
+    monthly_repayment = models.FloatField()
+    emis_paid_on_time = models.PositiveIntegerField(default=0)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    is_active = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["loan_id"], name="loan_archive_loan_id_idx"),
+        ]
+        ordering = ["-start_date"]
+
+    def __str__(self):
+        return f"Archived loan {self.loan_id} | Customer {self.customer_id}"
+
+
+class IngestedFile(models.Model):
+    """
+    Content hash of a source file that has been fully ingested.
+    Re-delivering identical content is skipped.
+    """
+
+    kind = models.CharField(max_length=20, help_text="customers or loans")
+    sha256 = models.CharField(max_length=64)
+    path = models.CharField(max_length=500)
+    rows = models.PositiveIntegerField(default=0)
+    ingested_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "sha256"], name="unique_ingested_file"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.sha256[:12]}"
+
+
+class RowFingerprint(models.Model):
+    """
+    Hash of the last ingested version of a source row,
+    keyed by its business ID (customer_id or loan_id).
+    """
+
+    kind = models.CharField(max_length=20, help_text="customers or loans")
+    business_id = models.PositiveBigIntegerField()
+    row_hash = models.BigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "business_id"], name="unique_row_fingerprint"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.business_id}"
+
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stored outcome of a create-loan request sent with an Idempotency-Key
+    header, replayed verbatim when the client retries with the same key.
+    """
+
+    key = models.CharField(max_length=255, unique=True)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    response_body = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Expiry pruning (prune_idempotency_keys)
+            models.Index(fields=["created_at"], name="idempotency_created_idx"),
+        ]
+
+    def __str__(self):
+        return self.key
+
+
+
+class CreditPolicy(models.Model):
+    """
+    Versioned scoring / approval policy. The active row with the highest
+    version is compiled by credit.services.policy and hot-reloaded.
+    """
+
+    version = models.PositiveIntegerField(unique=True)
+    config = models.JSONField(help_text="Overrides for credit.services.policy.DEFAULT_POLICY")
+    is_active = models.BooleanField(default=True)
+    description = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-version"]
+
+    def __str__(self):
+        return f"Credit policy v{self.version}"
+
+
+class PortfolioSnapshot(models.Model):
+    """
+    Latest computed result of one portfolio analytics metric, refreshed by
+    credit_celery.refresh_portfolio_analytics and served to dashboards.
+    """
+
+    metric = models.CharField(max_length=50, unique=True)
+    payload = models.JSONField()
+    watermark = models.CharField(
+        max_length=100,
+        help_text="State of the book the payload was computed from"
+    )
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.metric} @ {self.computed_at:%Y-%m-%d %H:%M}"
+
+
+class CreditScoreSnapshot(models.Model):
+    """
+    Credit score of a customer as of snapshot_date, written in bulk by
+    credit.services.scores. Every snapshot date holds a row per customer:
+    customers whose inputs did not change are carried forward.
+    """
+
+    customer = models.ForeignKey(
+        Customer,
+        on_delete=models.CASCADE,
+        related_name="score_snapshots"
+    )
+    snapshot_date = models.DateField()
+    score = models.FloatField()
+    slab = models.CharField(max_length=20, help_text="Approval slab the score falls in")
+    policy_version = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(help_text="Start of the run that computed the score")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer", "snapshot_date"], name="unique_customer_score_date"
+            ),
+        ]
+        indexes = [
+            # Customers ranked by score on a given date
+            models.Index(fields=["snapshot_date", "-score"], name="score_snapshot_rank_idx"),
+        ]
+
+    def __str__(self):
+        return f"Customer {self.customer_id} | {self.snapshot_date} | {self.score}"
@@ -0,0 +1,14 @@
+# credit/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class LoanCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (start_date, loan_id), newest first.
+    Page cost stays constant however deep the client scrolls.
+    """
+
+    ordering = ("-start_date", "-loan_id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
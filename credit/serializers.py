@@ -2,14 +2,34 @@
 
 from rest_framework import serializers
 from .models import Customer, Loan
+from .services.metrics import timed, timed_block
+
+
+# ================================
+# Serialization timing
+# (Reported by RequestMetricsMiddleware)
+# ================================
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed_block("serializer"):
+            return super().data
+
+
+class TimedSerializerMixin:
+    @property
+    def data(self):
+        with timed_block("serializer"):
+            return super().data
 
 
 # ================================
 # Customer Serializer
 # ================================
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Customer
+        list_serializer_class = TimedListSerializer
         fields = "__all__"
         read_only_fields = ("customer_id", "created_at")
 
@@ -17,15 +37,66 @@ class CustomerSerializer(serializers.ModelSerializer):
 # ================================
 # Loan Serializer (Full Loan View)
 # ================================
-class LoanSerializer(serializers.ModelSerializer):
+class LoanSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     customer = CustomerSerializer(read_only=True)
 
     class Meta:
         model = Loan
+        list_serializer_class = TimedListSerializer
         fields = "__all__"
         read_only_fields = ("loan_id", "created_at")
 
 
+# ================================
+# Flat Loan Serializer
+# (Sparse ?fields= listings)
+# ================================
+class FlatLoanSerializer:
+    """
+    Read-only rendering of requested loan columns straight from .values()
+    rows, skipping per-object ModelSerializer work. customer_id is the
+    customer's business ID.
+    """
+
+    FIELDS = {
+        "loan_id": "loan_id",
+        "customer_id": "customer__customer_id",
+        "loan_amount": "loan_amount",
+        "tenure": "tenure",
+        "interest_rate": "interest_rate",
+        "monthly_repayment": "monthly_repayment",
+        "emis_paid_on_time": "emis_paid_on_time",
+        "start_date": "start_date",
+        "end_date": "end_date",
+        "is_active": "is_active",
+        "created_at": "created_at",
+    }
+
+    # Always selected so cursor pagination can read its position
+    ORDERING_FIELDS = ("start_date", "loan_id")
+
+    def __init__(self, fields):
+        fields = [f.strip() for f in fields if f.strip()]
+        unknown = sorted(set(fields) - set(self.FIELDS))
+        if not fields or unknown:
+            raise serializers.ValidationError(
+                f"Unknown fields: {', '.join(unknown) or '(none given)'}. "
+                f"Allowed: {', '.join(self.FIELDS)}"
+            )
+        self.fields = list(dict.fromkeys(fields))
+
+    def prepare(self, queryset):
+        paths = {self.FIELDS[f] for f in self.fields} | set(self.ORDERING_FIELDS)
+        return queryset.values(*paths)
+
+    @timed("serializer")
+    def to_representation(self, rows):
+        return [
+            {field: row[self.FIELDS[field]] for field in self.fields}
+            for row in rows
+        ]
+
+
 # ================================
 # Check Eligibility Serializer
 # (For /check-eligibility endpoint)
@@ -0,0 +1,328 @@
+# credit/services/analytics.py
+import itertools
+import logging
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+
+from credit.models import Customer, CustomerCreditSummary, Loan, LoanArchive, PortfolioSnapshot
+from credit.services.policy import get_policy
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("exposure_by_slab", "emi_to_income", "delinquency", "vintage")
+
+# Upper edges of the EMI-to-income buckets; the last bucket is open-ended
+EMI_TO_INCOME_EDGES = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0)
+# (label, lowest missed EMI count) for the delinquency buckets
+MISSED_EMI_BUCKETS = (("current", 0), ("1-2", 1), ("3-5", 3), ("6+", 6))
+
+
+def chunk_size():
+    return getattr(settings, "CREDIT_ANALYTICS_CHUNK_SIZE", 50000)
+
+
+def cache_key(metric):
+    return f"credit:analytics:{metric}"
+
+
+def iter_frames(queryset, columns, size=None):
+    """Stream a queryset's values_list() as DataFrames of `size` rows."""
+    size = size or chunk_size()
+    rows = queryset.values_list(*columns).iterator(chunk_size=size)
+    while True:
+        batch = list(itertools.islice(rows, size))
+        if not batch:
+            return
+        yield pd.DataFrame.from_records(batch, columns=columns)
+
+
+def months_between(start_dates, today):
+    """Whole months from each start date to today (vectorized)."""
+    starts = pd.to_datetime(start_dates)
+    return ((today.year - starts.dt.year) * 12 + (today.month - starts.dt.month)).to_numpy()
+
+
+# ========================
+# Customer-level metrics
+# ========================
+CUSTOMER_COLUMNS = (
+    "approved_limit",
+    "monthly_salary",
+    "credit_summary__active_debt",
+    "credit_summary__active_emi_total",
+    "credit_summary__loan_count",
+    "credit_summary__on_time_emis",
+    "credit_summary__loans_per_year",
+)
+
+
+def customer_metrics(today=None):
+    """
+    Exposure by score slab and the EMI-to-income distribution, scored with
+    the active credit policy over streamed customer + summary rows.
+    """
+    today = today or date.today()
+    year = str(today.year)
+    policy = get_policy()
+
+    slabs = {}
+    labels = ["<=0.1"] + [
+        f"{low}-{high}" for low, high in zip(EMI_TO_INCOME_EDGES, EMI_TO_INCOME_EDGES[1:])
+    ] + [f">{EMI_TO_INCOME_EDGES[-1]}"]
+    buckets = {label: {"customers": 0, "exposure": 0, "emi": 0.0} for label in labels}
+    over_cap = customers = 0
+    ratio_samples = []
+
+    for frame in iter_frames(Customer.objects.order_by(), CUSTOMER_COLUMNS):
+        frame = frame.rename(columns=lambda c: c.replace("credit_summary__", ""))
+        this_year = frame["loans_per_year"].map(lambda counts: (counts or {}).get(year, 0))
+        frame = frame.drop(columns="loans_per_year").fillna(0)
+
+        limit = frame["approved_limit"].to_numpy(dtype=np.float64)
+        salary = frame["monthly_salary"].to_numpy(dtype=np.float64)
+        debt = frame["active_debt"].to_numpy(dtype=np.float64)
+        emi = frame["active_emi_total"].to_numpy(dtype=np.float64)
+
+        score = policy.credit_score_arrays(
+            limit, salary, debt, emi,
+            frame["loan_count"].to_numpy(dtype=np.float64),
+            frame["on_time_emis"].to_numpy(dtype=np.float64),
+            this_year.to_numpy(dtype=np.float64),
+        )
+        grouped = pd.DataFrame({
+            "slab": policy.slab_labels(score), "debt": debt, "emi": emi, "score": score,
+        }).groupby("slab").agg(
+            customers=("debt", "size"), exposure=("debt", "sum"), emi=("emi", "sum"), score=("score", "sum"),
+        )
+        for slab, row in grouped.iterrows():
+            totals = slabs.setdefault(slab, {"customers": 0, "exposure": 0, "emi": 0.0, "score_sum": 0.0})
+            totals["customers"] += int(row["customers"])
+            totals["exposure"] += int(row["exposure"])
+            totals["emi"] += float(row["emi"])
+            totals["score_sum"] += float(row["score"])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(salary > 0, emi / salary, np.inf)
+        ratio = np.where(emi == 0, 0.0, ratio)
+        index = np.searchsorted(EMI_TO_INCOME_EDGES, ratio, side="left")
+        for i, label in enumerate(labels):
+            mask = index == i
+            buckets[label]["customers"] += int(mask.sum())
+            buckets[label]["exposure"] += int(debt[mask].sum())
+            buckets[label]["emi"] += float(emi[mask].sum())
+        over_cap += int((ratio > policy.emi_salary_cap).sum())
+        customers += len(frame)
+        ratio_samples.append(ratio[np.isfinite(ratio)])
+
+    total_exposure = sum(s["exposure"] for s in slabs.values()) or 1
+    exposure_by_slab = {
+        "policy_version": policy.version,
+        "slabs": {
+            slab: {
+                "customers": totals["customers"],
+                "exposure": totals["exposure"],
+                "exposure_share": round(totals["exposure"] / total_exposure, 4),
+                "emi": round(totals["emi"], 2),
+                "avg_score": round(totals["score_sum"] / totals["customers"], 2),
+            }
+            for slab, totals in sorted(slabs.items())
+        },
+    }
+
+    ratios = np.concatenate(ratio_samples) if ratio_samples else np.empty(0)
+    quantiles = (
+        dict(zip(("p50", "p75", "p90", "p99"), np.round(np.quantile(ratios, [0.5, 0.75, 0.9, 0.99]), 4).tolist()))
+        if ratios.size else {}
+    )
+    emi_to_income = {
+        "customers": customers,
+        "over_policy_cap": over_cap,
+        "policy_cap": policy.emi_salary_cap,
+        "quantiles": quantiles,
+        "buckets": {
+            label: {**values, "emi": round(values["emi"], 2)} for label, values in buckets.items()
+        },
+    }
+    return exposure_by_slab, emi_to_income
+
+
+# ========================
+# Loan-level metrics
+# ========================
+LOAN_COLUMNS = ("loan_amount", "tenure", "emis_paid_on_time", "start_date", "is_active")
+
+
+def _loan_frame(frame, today):
+    elapsed = np.clip(months_between(frame["start_date"], today), 0, frame["tenure"].to_numpy())
+    missed = np.maximum(elapsed - frame["emis_paid_on_time"].to_numpy(), 0)
+    return frame.assign(elapsed=elapsed, missed=missed)
+
+
+def delinquency_metrics(today=None):
+    """
+    EMIs paid on time against EMIs due so far (elapsed tenure) for active
+    loans, overall and by missed-EMI bucket.
+    """
+    today = today or date.today()
+    buckets = {label: {"loans": 0, "exposure": 0} for label, _ in MISSED_EMI_BUCKETS}
+    due = missed_total = loans = exposure = delinquent_exposure = 0
+
+    active = Loan.objects.filter(is_active=True).order_by()
+    for frame in iter_frames(active, LOAN_COLUMNS):
+        frame = _loan_frame(frame, today)
+        due += int(frame["elapsed"].sum())
+        missed_total += int(frame["missed"].sum())
+        loans += len(frame)
+        exposure += int(frame["loan_amount"].sum())
+        delinquent_exposure += int(frame.loc[frame["missed"] > 0, "loan_amount"].sum())
+
+        edges = [low for _, low in MISSED_EMI_BUCKETS]
+        index = np.searchsorted(edges, frame["missed"].to_numpy(), side="right") - 1
+        for i, (label, _) in enumerate(MISSED_EMI_BUCKETS):
+            mask = index == i
+            buckets[label]["loans"] += int(mask.sum())
+            buckets[label]["exposure"] += int(frame["loan_amount"].to_numpy()[mask].sum())
+
+    return {
+        "active_loans": loans,
+        "exposure": exposure,
+        "emis_due": due,
+        "emis_missed": missed_total,
+        "missed_emi_ratio": round(missed_total / due, 4) if due else 0.0,
+        "delinquent_loans": loans - buckets["current"]["loans"],
+        "delinquent_loan_ratio": round((loans - buckets["current"]["loans"]) / loans, 4) if loans else 0.0,
+        "delinquent_exposure_ratio": round(delinquent_exposure / exposure, 4) if exposure else 0.0,
+        "buckets": buckets,
+    }
+
+
+def vintage_metrics(today=None):
+    """
+    Per start_date month cohort (live and archived loans): size, months on
+    book, share closed, share delinquent and on-time EMI ratio so far.
+    """
+    today = today or date.today()
+    cohorts = None
+
+    for model in (Loan, LoanArchive):
+        for frame in iter_frames(model.objects.order_by(), LOAN_COLUMNS):
+            frame = _loan_frame(frame, today)
+            frame["cohort"] = pd.to_datetime(frame["start_date"]).dt.strftime("%Y-%m")
+            grouped = frame.assign(
+                delinquent=frame["missed"] > 0,
+                closed=~frame["is_active"].astype(bool),
+                paid=np.minimum(frame["emis_paid_on_time"], frame["elapsed"]),
+            ).groupby("cohort").agg(
+                loans=("loan_amount", "size"),
+                principal=("loan_amount", "sum"),
+                delinquent=("delinquent", "sum"),
+                closed=("closed", "sum"),
+                emis_due=("elapsed", "sum"),
+                emis_paid=("paid", "sum"),
+            )
+            cohorts = grouped if cohorts is None else cohorts.add(grouped, fill_value=0)
+
+    if cohorts is None:
+        return {"cohorts": []}
+
+    rows = []
+    for cohort, row in cohorts.sort_index().iterrows():
+        year, month = map(int, cohort.split("-"))
+        rows.append({
+            "cohort": cohort,
+            "months_on_book": (today.year - year) * 12 + (today.month - month),
+            "loans": int(row["loans"]),
+            "principal": int(row["principal"]),
+            "closed_share": round(row["closed"] / row["loans"], 4),
+            "delinquent_share": round(row["delinquent"] / row["loans"], 4),
+            "on_time_ratio": round(row["emis_paid"] / row["emis_due"], 4) if row["emis_due"] else 1.0,
+        })
+    return {"cohorts": rows}
+
+
+# ========================
+# Refresh and serving
+# ========================
+def book_watermarks(today=None):
+    """
+    Cheap fingerprint, per metric, of the state the metric depends on.
+    Customer metrics change with the policy version, any summary change
+    (loans, salary, limit), the customer count and the year (current-year
+    loan counts); loan metrics with loan writes and the calendar month
+    (elapsed tenure is counted in whole months).
+    """
+    today = today or date.today()
+    last_change = CustomerCreditSummary.objects.aggregate(last=Max("updated_at"))["last"]
+    last_change = last_change.isoformat() if last_change else "-"
+
+    customers = ":".join(str(part) for part in (
+        today.year, get_policy().version, last_change, Customer.objects.count(),
+    ))
+    loans = ":".join(str(part) for part in (
+        today.strftime("%Y-%m"), last_change, Loan.objects.count(), LoanArchive.objects.count(),
+    ))
+    return {
+        "exposure_by_slab": customers,
+        "emi_to_income": customers,
+        "delinquency": loans,
+        "vintage": loans,
+    }
+
+
+def refresh_analytics(force=False):
+    """
+    Recompute the metrics whose inputs changed since their stored
+    snapshot (all of them with force=True). Results are written to
+    PortfolioSnapshot and the cache. Returns the list of metrics recomputed.
+    """
+    watermarks = book_watermarks()
+    stored = dict(PortfolioSnapshot.objects.values_list("metric", "watermark"))
+    stale = [metric for metric in METRICS if force or stored.get(metric) != watermarks[metric]]
+    if not stale:
+        logger.info("Portfolio unchanged since last analytics refresh, skipping")
+        return []
+
+    results = {}
+    if "exposure_by_slab" in stale or "emi_to_income" in stale:
+        # One pass over the customers produces both
+        results["exposure_by_slab"], results["emi_to_income"] = customer_metrics()
+    if "delinquency" in stale:
+        results["delinquency"] = delinquency_metrics()
+    if "vintage" in stale:
+        results["vintage"] = vintage_metrics()
+
+    for metric, payload in results.items():
+        snapshot, _ = PortfolioSnapshot.objects.update_or_create(
+            metric=metric, defaults={"payload": payload, "watermark": watermarks[metric]}
+        )
+        cache.set(cache_key(metric), _served(snapshot), getattr(settings, "CREDIT_ANALYTICS_CACHE_TTL", 3600))
+    return list(results)
+
+
+def _served(snapshot):
+    return {
+        "metric": snapshot.metric,
+        "computed_at": snapshot.computed_at.isoformat(),
+        "data": snapshot.payload,
+    }
+
+
+def get_analytics(metric):
+    """Latest stored result for a metric from the cache or snapshot table; None if never computed."""
+    if metric not in METRICS:
+        raise KeyError(metric)
+    result = cache.get(cache_key(metric))
+    if result is not None:
+        return result
+
+    snapshot = PortfolioSnapshot.objects.filter(metric=metric).first()
+    if snapshot is None:
+        return None
+    result = _served(snapshot)
+    cache.set(cache_key(metric), result, getattr(settings, "CREDIT_ANALYTICS_CACHE_TTL", 3600))
+    return result
@@ -0,0 +1,162 @@
+# credit/services/archive.py
+import logging
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from credit.models import Loan, LoanArchive
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = (
+    "id",
+    "loan_id",
+    "customer_id",
+    "loan_amount",
+    "tenure",
+    "interest_rate",
+    "monthly_repayment",
+    "emis_paid_on_time",
+    "start_date",
+    "end_date",
+    "is_active",
+    "created_at",
+)
+
+
+def archive_cutoff(today=None):
+    """Loans whose end_date is before this date are eligible for archival."""
+    today = today or date.today()
+    return today - timedelta(days=getattr(settings, "CREDIT_ARCHIVE_AFTER_DAYS", 90))
+
+
+def archivable_loans(cutoff):
+    return Loan.objects.filter(is_active=False, end_date__lt=cutoff)
+
+
+def ensure_archive_partitions(years):
+    """
+    Create the yearly start_date partitions of the archive table
+    (PostgreSQL). Rows of a new year already sitting in the DEFAULT
+    partition are moved into it: the default is detached while the
+    partition is created and re-attached afterwards, since PostgreSQL
+    refuses a partition whose range the default already holds rows for.
+    """
+    if connection.vendor != "postgresql":
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        for year in sorted({int(year) for year in years}):
+            table = f"credit_loanarchive_y{year}"
+            cursor.execute("SELECT to_regclass(%s)", [table])
+            if cursor.fetchone()[0] is not None:
+                continue
+
+            start, end = f"{year}-01-01", f"{year + 1}-01-01"
+            cursor.execute("ALTER TABLE credit_loanarchive DETACH PARTITION credit_loanarchive_default")
+            cursor.execute(
+                f"CREATE TABLE {table} PARTITION OF credit_loanarchive "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+            cursor.execute(
+                """
+                WITH stray AS (
+                    DELETE FROM credit_loanarchive_default
+                    WHERE start_date >= %s AND start_date < %s
+                    RETURNING *
+                )
+                INSERT INTO credit_loanarchive SELECT * FROM stray
+                """,
+                [start, end],
+            )
+            cursor.execute("ALTER TABLE credit_loanarchive ATTACH PARTITION credit_loanarchive_default DEFAULT")
+
+
+def archive_closed_loans(cutoff=None, batch_size=None, limit=None):
+    """
+    Move inactive loans that ended before `cutoff` from Loan into
+    LoanArchive, batch_size rows per transaction. Customer summaries are
+    untouched: archived loans keep counting towards loan_count, on-time
+    EMIs and loans per year, and were never part of the active sums.
+    Returns the number of loans archived.
+    """
+    cutoff = cutoff or archive_cutoff()
+    batch_size = batch_size or getattr(settings, "CREDIT_ARCHIVE_BATCH_SIZE", 5000)
+
+    archived = 0
+    while limit is None or archived < limit:
+        size = batch_size if limit is None else min(batch_size, limit - archived)
+        if connection.vendor == "postgresql":
+            moved = _move_batch_sql(cutoff, size)
+        else:
+            moved = _move_batch_orm(cutoff, size)
+        if not moved:
+            break
+        archived += moved
+        logger.info("Archived %d loans (%d total)", moved, archived)
+
+    return archived
+
+
+def _move_batch_sql(cutoff, size):
+    columns = ", ".join(ARCHIVE_COLUMNS)
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Lock the batch first so its partitions are created for exactly
+        # the years being moved, including loans closed since the run began
+        cursor.execute(
+            """
+            SELECT id, EXTRACT(YEAR FROM start_date)::int FROM credit_loan
+            WHERE is_active = false AND end_date < %s
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+            """,
+            [cutoff, size],
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return 0
+        ensure_archive_partitions(year for _, year in rows)
+
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM credit_loan
+                WHERE id = ANY(%s)
+                RETURNING {columns}
+            )
+            INSERT INTO credit_loanarchive ({columns}, archived_at)
+            SELECT {columns}, %s FROM moved
+            """,
+            [[loan_id for loan_id, _ in rows], timezone.now()],
+        )
+        return cursor.rowcount
+
+
+def _move_batch_orm(cutoff, size):
+    with transaction.atomic():
+        rows = list(
+            archivable_loans(cutoff)
+            .select_for_update()
+            .order_by("id")
+            .values(*ARCHIVE_COLUMNS)[:size]
+        )
+        if not rows:
+            return 0
+        LoanArchive.objects.bulk_create([LoanArchive(**row) for row in rows])
+        Loan.objects.filter(id__in=[row["id"] for row in rows]).delete()
+        return len(rows)
+
+
+def restore_archived_loans(loan_ids):
+    """
+    Drop archived copies of loans that are being written to Loan again
+    (e.g. a corrected row re-ingested from the source file), so each loan
+    lives in exactly one table. Returns the customer pks affected.
+    """
+    archived = LoanArchive.objects.filter(loan_id__in=loan_ids)
+    customer_ids = set(archived.values_list("customer_id", flat=True))
+    if customer_ids:
+        archived.delete()
+    return customer_ids
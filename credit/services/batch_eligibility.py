@@ -0,0 +1,90 @@
+# credit/services/batch_eligibility.py
+import numpy as np
+
+from credit.models import Customer
+from credit.services.credit_profile import get_credit_profiles
+from credit.services.policy import get_policy
+
+
+def check_eligibility_batch(requests):
+    """
+    Evaluate many (customer_id, loan_amount, interest_rate, tenure) requests
+    at once. Customers and their loan aggregates are fetched with a constant
+    number of queries; scoring, rate slabs and EMIs are computed on NumPy
+    arrays by the active credit policy. Each result matches what
+    check_eligibility_logic returns for the same request. Results keep the order of the input.
+    """
+    requests = list(requests)
+    if not requests:
+        return []
+
+    customer_ids = {int(r[0]) for r in requests}
+    customers = {
+        c.customer_id: c
+        for c in Customer.objects.filter(customer_id__in=customer_ids).only(
+            "id", "customer_id", "monthly_salary", "approved_limit"
+        )
+    }
+    profiles = get_credit_profiles(c.pk for c in customers.values())
+
+    found = [int(r[0]) in customers for r in requests]
+    rows = [r for r, ok in zip(requests, found) if ok]
+    decisions = iter(_evaluate(rows, customers, profiles)) if rows else iter(())
+
+    results = []
+    for request, ok in zip(requests, found):
+        customer_id, loan_amount, interest_rate, tenure = request
+        if not ok:
+            results.append({"customer_id": int(customer_id), "error": "Customer not found"})
+            continue
+        approved, corrected_rate, monthly_installment = next(decisions)
+        results.append({
+            "customer_id": int(customer_id),
+            "approval": approved,
+            "interest_rate": interest_rate,
+            "corrected_interest_rate": corrected_rate,
+            "tenure": tenure,
+            "monthly_installment": monthly_installment,
+        })
+    return results
+
+
+def _evaluate(rows, customers, profiles):
+    n = len(rows)
+    customer_id = np.fromiter((int(r[0]) for r in rows), dtype=np.int64, count=n)
+    loan_amount = np.fromiter((float(r[1]) for r in rows), dtype=np.float64, count=n)
+    interest_rate = np.fromiter((float(r[2]) for r in rows), dtype=np.float64, count=n)
+    tenure = np.fromiter((int(r[3]) for r in rows), dtype=np.int64, count=n)
+
+    limit = np.empty(n)
+    salary = np.empty(n)
+    principal = np.empty(n)
+    emi_total = np.empty(n)
+    loan_count = np.empty(n)
+    on_time = np.empty(n)
+    this_year = np.empty(n)
+    for i, cid in enumerate(customer_id.tolist()):
+        customer = customers[cid]
+        profile = profiles[customer.pk]
+        limit[i] = customer.approved_limit
+        salary[i] = customer.monthly_salary
+        principal[i] = profile["active_principal"]
+        emi_total[i] = profile["active_emi"]
+        loan_count[i] = profile["loan_count"]
+        on_time[i] = profile["on_time_emis"]
+        this_year[i] = profile["current_year_loans"]
+
+    rejected, approved, corrected, emi = get_policy().evaluate_arrays(
+        limit, salary, principal, emi_total, loan_count, on_time, this_year,
+        loan_amount, interest_rate, tenure,
+    )
+
+    decisions = []
+    for i in range(n):
+        if rejected[i]:
+            decisions.append((False, float(interest_rate[i]), 0))
+        elif not approved[i]:
+            decisions.append((False, round(float(corrected[i]), 2), 0))
+        else:
+            decisions.append((True, round(float(corrected[i]), 2), float(emi[i])))
+    return decisions
@@ -0,0 +1,170 @@
+# credit/services/bootstrap.py
+import logging
+import random
+import time
+import zlib
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.utils import OperationalError
+
+from credit.models import IngestedFile
+from credit.services.fingerprints import already_ingested, file_sha256, record_file
+from credit.services.ingestion import CUSTOMER_FILE, LOAN_FILE, ingest_files
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_lock key shared by every process that may run the bootstrap
+BOOTSTRAP_LOCK_KEY = zlib.crc32(b"credit:bootstrap")
+STATE_KEY = "credit:bootstrap:state"
+
+
+class BootstrapBusy(Exception):
+    """Another process holds the bootstrap lock."""
+
+
+# ========================
+# Locking and retries
+# ========================
+@contextmanager
+def advisory_lock(key, wait=False):
+    """
+    Session-level PostgreSQL advisory lock. Yields True when acquired; with
+    wait=False yields False immediately if another session holds it.
+    Other databases fall back to cache.add, which only excludes other
+    processes when the default cache is shared (Redis); with the locmem
+    fallback it covers a single process.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            if wait:
+                cursor.execute("SELECT pg_advisory_lock(%s)", [key])
+                acquired = True
+            else:
+                cursor.execute("SELECT pg_try_advisory_lock(%s)", [key])
+                acquired = cursor.fetchone()[0]
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", [key])
+        return
+
+    cache_key = f"credit:lock:{key}"
+    acquired = cache.add(cache_key, 1, timeout=3600)
+    while wait and not acquired:
+        time.sleep(1)
+        acquired = cache.add(cache_key, 1, timeout=3600)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            cache.delete(cache_key)
+
+
+def wait_for_database(max_attempts=None, base_delay=0.5, max_delay=30):
+    """
+    Block until the default database accepts connections, retrying with
+    exponential backoff and jitter. Raises the last OperationalError.
+    """
+    max_attempts = max_attempts or getattr(settings, "CREDIT_BOOTSTRAP_DB_ATTEMPTS", 10)
+    for attempt in range(max_attempts):
+        try:
+            connection.ensure_connection()
+            return
+        except OperationalError:
+            if attempt == max_attempts - 1:
+                raise
+            delay = min(base_delay * 2 ** attempt, max_delay) * random.uniform(0.5, 1.5)
+            logger.warning("Database not ready, retrying in %.1fs (%d/%d)", delay, attempt + 1, max_attempts)
+            connection.close()
+            time.sleep(delay)
+
+
+# ========================
+# Bootstrap
+# ========================
+def source_versions(customer_file=CUSTOMER_FILE, loan_file=LOAN_FILE):
+    """Content hash of each source file: the data version to be loaded."""
+    return {"customers": file_sha256(customer_file), "loans": file_sha256(loan_file)}
+
+
+def set_state(status, **extra):
+    try:
+        cache.set(STATE_KEY, {"status": status, "at": time.time(), **extra}, timeout=None)
+    except Exception:
+        logger.warning("Could not publish bootstrap state", exc_info=True)
+
+
+def run_bootstrap(force=False, wait=False, customer_file=CUSTOMER_FILE, loan_file=LOAN_FILE):
+    """
+    Load the source files once, under an advisory lock so concurrent web
+    or worker processes do not load in parallel. Skips the load when both
+    files are already ingested at their current content hash unless force.
+    Returns a summary dict; raises BootstrapBusy if the lock is held and
+    wait is False.
+    """
+    wait_for_database()
+    versions = source_versions(customer_file, loan_file)
+
+    with advisory_lock(BOOTSTRAP_LOCK_KEY, wait=wait) as acquired:
+        if not acquired:
+            raise BootstrapBusy("Another process is loading the initial data")
+
+        if not force and all(already_ingested(kind, digest) for kind, digest in versions.items()):
+            logger.info("Initial data already at the current version, nothing to load")
+            set_state("ready", versions=versions)
+            return {"skipped": True, "versions": versions}
+
+        set_state("loading", versions=versions)
+        try:
+            # force re-upserts every row instead of only changed ones
+            stats = ingest_files(customer_file, loan_file, delta=False if force else None)
+        except Exception as e:
+            set_state("failed", error=str(e))
+            raise
+
+        # Recorded even when delta ingestion is off, so readiness and
+        # later runs see this version as loaded
+        for kind, path in (("customers", customer_file), ("loans", loan_file)):
+            record_file(kind, versions[kind], path, stats[kind]["rows"])
+        set_state("ready", versions=versions)
+        return {"skipped": False, "versions": versions, **stats}
+
+
+# ========================
+# Readiness
+# ========================
+_loaded = False
+
+
+def readiness():
+    """
+    (ready, details). Not ready until a first complete load of both source
+    files exists. Later reloads of newer versions keep the app ready (they
+    upsert over complete data) and are reported as "loading".
+    """
+    global _loaded
+
+    details = {"database": False, "data_loaded": False, "bootstrap": None}
+    try:
+        connection.ensure_connection()
+        details["database"] = True
+    except OperationalError:
+        return False, details
+
+    try:
+        state = cache.get(STATE_KEY)
+    except Exception:
+        state = None
+    details["bootstrap"] = state["status"] if state else None
+
+    if not _loaded:
+        kinds = set(IngestedFile.objects.values_list("kind", flat=True).distinct())
+        _loaded = {"customers", "loans"} <= kinds
+    details["data_loaded"] = _loaded
+
+    return _loaded, details
@@ -0,0 +1,124 @@
+# credit/services/credit_profile.py
+from datetime import date
+
+from django.db.models import Count, Q, Sum
+
+from credit.models import CustomerCreditSummary, Loan, LoanArchive
+
+
+def empty_profile():
+    return {
+        "active_principal": 0,
+        "active_emi": 0.0,
+        "loan_count": 0,
+        "on_time_emis": 0,
+        "current_year_loans": 0,
+    }
+
+
+def profile_aggregates():
+    """Conditional aggregate expressions producing every profile field."""
+    active = Q(is_active=True)
+    this_year = Q(start_date__year=date.today().year)
+    return {
+        "active_principal": Sum("loan_amount", filter=active),
+        "active_emi": Sum("monthly_repayment", filter=active),
+        "loan_count": Count("id"),
+        "on_time_emis": Sum("emis_paid_on_time"),
+        "current_year_loans": Count("id", filter=this_year),
+    }
+
+
+def add_totals(profile, totals):
+    for key, value in totals.items():
+        if value is not None:
+            profile[key] += value
+    return profile
+
+
+def profile_from_summary(summary):
+    return {
+        "active_principal": summary.active_debt,
+        "active_emi": summary.active_emi_total,
+        "loan_count": summary.loan_count,
+        "on_time_emis": summary.on_time_emis,
+        "current_year_loans": summary.loans_per_year.get(str(date.today().year), 0),
+    }
+
+
+def get_credit_profile(customer):
+    """
+    Scoring inputs for a customer. Reads the CustomerCreditSummary row by
+    primary key and only falls back to aggregating the loan table for
+    customers that have no summary yet.
+    """
+    summary = CustomerCreditSummary.objects.filter(pk=customer.pk).first()
+    if summary is not None:
+        return profile_from_summary(summary)
+    return aggregate_credit_profile(customer)
+
+
+def aggregate_credit_profile(customer):
+    """
+    Collect every loan aggregate the scoring rules need with one SQL query
+    per loan table (live and archived): active principal, active EMI
+    total, loan count, EMIs paid on time and number of loans started in
+    the current year.
+    """
+    profile = empty_profile()
+    for model in (Loan, LoanArchive):
+        add_totals(profile, model.objects.filter(customer=customer).aggregate(**profile_aggregates()))
+    return profile
+
+
+def get_credit_profiles(customer_pks):
+    """
+    Scoring inputs for many customers, keyed by customer pk: one query on
+    the summary table plus grouped aggregates (live and archived loans)
+    for customers without a summary row.
+    """
+    customer_pks = list(customer_pks)
+    profiles = {
+        summary.customer_id: profile_from_summary(summary)
+        for summary in CustomerCreditSummary.objects.filter(pk__in=customer_pks)
+    }
+
+    missing = [pk for pk in customer_pks if pk not in profiles]
+    if missing:
+        profiles.update(aggregate_credit_profiles(missing))
+    return profiles
+
+
+def aggregate_credit_profiles(customer_pks):
+    """Grouped-query version of aggregate_credit_profile."""
+    profiles = {pk: empty_profile() for pk in customer_pks}
+    for model in (Loan, LoanArchive):
+        rows = (
+            model.objects.filter(customer_id__in=profiles.keys())
+            .order_by()
+            .values("customer_id")
+            .annotate(**profile_aggregates())
+        )
+        for row in rows:
+            add_totals(profiles[row.pop("customer_id")], row)
+    return profiles
+
+
+async def aget_credit_profile(customer_id):
+    """
+    Async get_credit_profile keyed by the business customer_id, so it can
+    run concurrently with the customer lookup itself.
+    """
+    summary = await CustomerCreditSummary.objects.filter(
+        customer__customer_id=customer_id
+    ).afirst()
+    if summary is not None:
+        return profile_from_summary(summary)
+
+    profile = empty_profile()
+    for model in (Loan, LoanArchive):
+        totals = await model.objects.filter(
+            customer__customer_id=customer_id
+        ).aaggregate(**profile_aggregates())
+        add_totals(profile, totals)
+    return profile
@@ -0,0 +1,249 @@
+# credit/services/credit_summary.py
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, ExtractYear
+from django.utils import timezone
+
+from credit.models import Customer, CustomerCreditSummary, Loan, LoanArchive
+from credit.services.score_cache import credit_cache
+
+SUMMARY_FIELDS = (
+    "active_debt",
+    "active_emi_total",
+    "loan_count",
+    "on_time_emis",
+    "loans_per_year",
+)
+
+
+def loan_state(loan):
+    """Snapshot of the Loan fields that feed the summary counters."""
+    return {
+        "customer_id": loan.customer_id,
+        "loan_amount": loan.loan_amount,
+        "monthly_repayment": loan.monthly_repayment,
+        "emis_paid_on_time": loan.emis_paid_on_time,
+        "is_active": loan.is_active,
+        "start_date": loan.start_date,
+    }
+
+
+def lock_customers(customer_ids):
+    """
+    select_for_update the given customers in pk order, so every writer
+    takes row locks in the same order. Call inside a transaction.
+    Returns the sorted pks.
+    """
+    customer_ids = sorted(set(customer_ids))
+    list(
+        Customer.objects.select_for_update()
+        .filter(pk__in=customer_ids)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    return customer_ids
+
+
+# ========================
+# Incremental maintenance
+# ========================
+def record_loan_change(before=None, after=None):
+    """
+    Apply the difference between two loan states (see loan_state) to the
+    affected summaries. Pass before=None for inserts and after=None for
+    deletes. Must run inside the transaction that wrote the loan.
+    """
+    customer_ids = sorted({s["customer_id"] for s in (before, after) if s})
+    credit_cache.invalidate_on_commit(customer_ids)
+
+    for customer_id in customer_ids:
+        changes = []
+        if before and before["customer_id"] == customer_id:
+            changes.append((before, -1))
+        if after and after["customer_id"] == customer_id:
+            changes.append((after, 1))
+        _apply_changes(customer_id, changes)
+
+
+def _apply_changes(customer_id, changes):
+    # Serialize with create_loan and other writers of this customer's loans
+    lock_customers([customer_id])
+    summary = (
+        CustomerCreditSummary.objects
+        .select_for_update()
+        .filter(customer_id=customer_id)
+        .first()
+    )
+
+    # No row yet: build it from the loan table, which already holds the change
+    if summary is None:
+        rebuild_summaries([customer_id])
+        return
+
+    for state, sign in changes:
+        if state["is_active"]:
+            summary.active_debt += sign * state["loan_amount"]
+            summary.active_emi_total = round(
+                summary.active_emi_total + sign * state["monthly_repayment"], 2
+            )
+        summary.loan_count += sign
+        summary.on_time_emis += sign * state["emis_paid_on_time"]
+
+        if state["start_date"]:
+            year = str(state["start_date"].year)
+            count = summary.loans_per_year.get(year, 0) + sign
+            if count:
+                summary.loans_per_year[year] = count
+            else:
+                summary.loans_per_year.pop(year, None)
+
+    summary.save()
+
+
+def ensure_summaries(customer_ids):
+    """
+    Create empty summary rows for new customers, so every customer has one
+    even before their first loan. Existing rows are left alone.
+    """
+    CustomerCreditSummary.objects.bulk_create(
+        [CustomerCreditSummary(customer_id=pk, loans_per_year={}) for pk in customer_ids],
+        ignore_conflicts=True,
+    )
+
+
+def touch_summaries(customer_ids):
+    """
+    Bump updated_at for customers whose salary or limit changed, so the
+    incremental score snapshot job rescores them.
+    """
+    CustomerCreditSummary.objects.filter(customer_id__in=list(customer_ids)).update(
+        updated_at=timezone.now()
+    )
+
+
+# ========================
+# Full rebuild / verification
+# ========================
+def compute_summaries(customer_ids):
+    """
+    Recompute summaries for the given customer primary keys from the live
+    and archived loan tables. Returns unsaved CustomerCreditSummary
+    objects, one per customer.
+    """
+    summaries = {
+        pk: CustomerCreditSummary(customer_id=pk, loans_per_year={})
+        for pk in customer_ids
+    }
+    active = Q(is_active=True)
+
+    # Archived loans are closed but still count towards history
+    for model in (Loan, LoanArchive):
+        loans = model.objects.filter(customer_id__in=summaries.keys()).order_by()
+
+        totals = loans.values("customer_id").annotate(
+            active_debt=Sum("loan_amount", filter=active),
+            active_emi_total=Sum("monthly_repayment", filter=active),
+            loan_count=Count("id"),
+            on_time_emis=Sum("emis_paid_on_time"),
+        )
+        for row in totals:
+            summary = summaries[row["customer_id"]]
+            summary.active_debt += row["active_debt"] or 0
+            summary.active_emi_total = round(
+                summary.active_emi_total + (row["active_emi_total"] or 0.0), 2
+            )
+            summary.loan_count += row["loan_count"]
+            summary.on_time_emis += row["on_time_emis"] or 0
+
+        per_year = (
+            loans.annotate(year=ExtractYear("start_date"))
+            .values("customer_id", "year")
+            .annotate(count=Count("id"))
+        )
+        for row in per_year:
+            if row["year"] is not None:
+                year_counts = summaries[row["customer_id"]].loans_per_year
+                year_counts[str(row["year"])] = year_counts.get(str(row["year"]), 0) + row["count"]
+
+    return list(summaries.values())
+
+
+def rebuild_summaries(customer_ids=None, batch_size=1000):
+    """
+    Recompute and upsert summaries. Rebuilds every customer when
+    customer_ids is None. Each chunk locks its customers (in pk order)
+    before reading their loans, so a concurrent create_loan either
+    commits first and is counted or waits for the rebuild.
+    Returns the number of rows written.
+    """
+    written = 0
+    for chunk in _customer_chunks(customer_ids, batch_size):
+        with transaction.atomic():
+            lock_customers(chunk)
+            CustomerCreditSummary.objects.bulk_create(
+                compute_summaries(chunk),
+                update_conflicts=True,
+                unique_fields=["customer"],
+                update_fields=[*SUMMARY_FIELDS, "updated_at"],
+            )
+            credit_cache.invalidate_on_commit(chunk)
+        written += len(chunk)
+    return written
+
+
+def verify_summaries(customer_ids=None, batch_size=1000):
+    """
+    Compare stored summaries with a fresh recomputation.
+    Returns a list of (customer_pk, field, stored, expected) drift records.
+    """
+    drift = []
+    for chunk in _customer_chunks(customer_ids, batch_size):
+        stored = CustomerCreditSummary.objects.in_bulk(chunk)
+        for expected in compute_summaries(chunk):
+            current = stored.get(expected.customer_id)
+            if current is None:
+                drift.append((expected.customer_id, "missing", None, None))
+                continue
+            for field in SUMMARY_FIELDS:
+                have = getattr(current, field)
+                want = getattr(expected, field)
+                if field == "active_emi_total":
+                    if abs(have - want) > 0.01:
+                        drift.append((expected.customer_id, field, have, want))
+                elif have != want:
+                    drift.append((expected.customer_id, field, have, want))
+    return drift
+
+
+def _customer_chunks(customer_ids, batch_size):
+    """Customer pks in ascending order, batch_size at a time."""
+    if customer_ids is not None:
+        customer_ids = sorted(set(customer_ids))
+    else:
+        customer_ids = Customer.objects.order_by("pk").values_list("pk", flat=True).iterator(
+            chunk_size=batch_size
+        )
+
+    chunk = []
+    for pk in customer_ids:
+        chunk.append(pk)
+        if len(chunk) >= batch_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def reconcile_current_debt():
+    """
+    Set Customer.current_debt to the sum of the customer's active loans
+    in one UPDATE. Returns the number of customers updated.
+    """
+    active_debt = (
+        Loan.objects.filter(customer=OuterRef("pk"), is_active=True)
+        .order_by()
+        .values("customer")
+        .annotate(total=Sum("loan_amount"))
+        .values("total")
+    )
+    return Customer.objects.update(current_debt=Coalesce(Subquery(active_debt), 0))
@@ -0,0 +1,54 @@
+# credit/services/db_pool.py
+from django.conf import settings
+from django.db import connections
+
+
+def pool_mode():
+    return getattr(settings, "DB_POOL_MODE", "none")
+
+
+def pool_stats():
+    """
+    Connection pool statistics per database alias, for aliases served by
+    a psycopg pool (DB_POOL_MODE=pool). Keys follow psycopg_pool's
+    get_stats(): pool_size, pool_available, requests_waiting, ...
+    """
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is None:
+            continue
+        stats[alias] = {
+            "pool_min": pool.min_size,
+            "pool_max": pool.max_size,
+            **pool.get_stats(),
+        }
+    return stats
+
+
+# psycopg_pool counters exported as Prometheus gauges
+POOL_GAUGES = {
+    "pool_size": "Connections currently managed by the pool.",
+    "pool_available": "Idle connections in the pool.",
+    "pool_max": "Configured maximum pool size.",
+    "requests_waiting": "Clients waiting for a connection.",
+    "requests_num": "Connection requests served since start.",
+    "requests_queued": "Requests that had to wait for a connection.",
+    "requests_wait_ms": "Total time clients waited for a connection.",
+    "requests_errors": "Connection requests that failed or timed out.",
+}
+
+
+def pool_metric_lines():
+    """Prometheus text lines for the pool gauges, empty when pooling is off."""
+    stats = pool_stats()
+    if not stats:
+        return []
+    role = getattr(settings, "CREDIT_PROCESS_ROLE", "web")
+    lines = []
+    for key, documentation in POOL_GAUGES.items():
+        name = f"credit_db_{key}"
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+        for alias, values in sorted(stats.items()):
+            lines.append(f'{name}{{alias="{alias}",role="{role}"}} {values.get(key, 0)}')
+    return lines
@@ -0,0 +1,111 @@
+# credit/services/emi.py
+from functools import lru_cache
+
+import numpy as np
+
+from credit.services.metrics import timed
+
+# Floor rates applied by the approval slabs; their terms are precomputed
+SLAB_RATES = (12, 16)
+MAX_TENURE_MONTHS = 360
+
+
+@lru_cache(maxsize=8192)
+def annuity_terms(annual_rate, tenure_months):
+    """
+    Memoized (monthly rate, (1 + r) ** n) pair for a rate/tenure.
+
+    The growth term is cached rather than the combined annuity factor so
+    that EMIs are still evaluated as principal * r * g / (g - 1), the same
+    operation order as before, and round to exactly the same values.
+    """
+    r_month = annual_rate / 12 / 100
+    return r_month, (1 + r_month) ** tenure_months
+
+
+def warm_annuity_table(rates=SLAB_RATES, max_tenure=MAX_TENURE_MONTHS):
+    for rate in rates:
+        for tenure in range(1, max_tenure + 1):
+            annuity_terms(rate, tenure)
+
+
+@timed("emi")
+def calculate_emi(principal, annual_rate, tenure_months):
+    r_month, growth = annuity_terms(annual_rate, tenure_months)
+    n = tenure_months
+
+    if r_month == 0:
+        return round(principal / n, 2)
+
+    emi = principal * r_month * growth / (growth - 1)
+    return round(emi, 2)
+
+
+def emi_array(principal, annual_rate, tenure_months):
+    """
+    Unrounded EMIs for arrays of principals, annual rates and tenures.
+    Growth terms are computed once per distinct (rate, tenure) pair.
+    """
+    principal = np.asarray(principal, dtype=np.float64)
+    annual_rate = np.asarray(annual_rate, dtype=np.float64)
+    tenure_months = np.asarray(tenure_months, dtype=np.int64)
+    if principal.size == 0:
+        return np.empty(0)
+
+    pairs, inverse = np.unique(
+        np.stack([annual_rate, tenure_months.astype(np.float64)]),
+        axis=1,
+        return_inverse=True,
+    )
+    terms = np.array([annuity_terms(float(rate), int(tenure)) for rate, tenure in pairs.T])
+    inverse = inverse.reshape(-1)
+    r_month = terms[inverse, 0]
+    growth = terms[inverse, 1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        emi = principal * r_month * growth / (growth - 1)
+        flat = principal / tenure_months
+    return np.where(r_month == 0, flat, emi)
+
+
+def calculate_emi_array(principal, annual_rate, tenure_months):
+    """
+    Vectorized calculate_emi. Rounding uses Python's round() per element:
+    np.round scales by 100 first and can land on the other side of a
+    half-cent, which would break parity with the scalar path.
+    """
+    emi = emi_array(principal, annual_rate, tenure_months)
+    return np.array([round(value, 2) for value in emi.tolist()])
+
+
+def amortization_schedule(principal, annual_rate, tenure_months):
+    """
+    Month-by-month split of each EMI into interest and principal.
+    The last instalment absorbs the rounding residue so the balance ends at 0.
+    """
+    emi = calculate_emi(principal, annual_rate, tenure_months)
+    r_month, _ = annuity_terms(annual_rate, tenure_months)
+
+    balance = float(principal)
+    schedule = []
+    for month in range(1, tenure_months + 1):
+        interest = round(balance * r_month, 2)
+        if month == tenure_months:
+            principal_part = round(balance, 2)
+            payment = round(principal_part + interest, 2)
+        else:
+            principal_part = round(emi - interest, 2)
+            payment = emi
+        balance = max(round(balance - principal_part, 2), 0.0)
+
+        schedule.append({
+            "month": month,
+            "emi": payment,
+            "principal": principal_part,
+            "interest": interest,
+            "balance": balance,
+        })
+    return schedule
+
+
+warm_annuity_table()
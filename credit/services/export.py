@@ -0,0 +1,41 @@
+# credit/services/export.py
+import csv
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class _Echo:
+    """File-like object whose write() just returns the line, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def stream_export(queryset, columns, fmt, chunk_size=None):
+    """
+    Yield an export of queryset row by row. columns maps output names to
+    ORM paths. Rows come from a server-side cursor in chunks of chunk_size
+    (CREDIT_EXPORT_CHUNK_SIZE by default), so memory stays flat and the
+    first bytes go out before the query is exhausted.
+    """
+    chunk_size = chunk_size or getattr(settings, "CREDIT_EXPORT_CHUNK_SIZE", 2000)
+    names = list(columns)
+    rows = queryset.values_list(*columns.values()).iterator(chunk_size=chunk_size)
+
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(names)
+        for row in rows:
+            yield writer.writerow(row)
+    elif fmt == "ndjson":
+        encoder = DjangoJSONEncoder()
+        for row in rows:
+            yield encoder.encode(dict(zip(names, row))) + "\n"
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
@@ -0,0 +1,69 @@
+# credit/services/fingerprints.py
+import hashlib
+
+import pandas as pd
+
+from credit.models import IngestedFile, RowFingerprint
+
+
+# ========================
+# File level
+# ========================
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def already_ingested(kind, sha256):
+    return IngestedFile.objects.filter(kind=kind, sha256=sha256).exists()
+
+
+def record_file(kind, sha256, path, rows):
+    IngestedFile.objects.get_or_create(
+        kind=kind,
+        sha256=sha256,
+        defaults={"path": str(path), "rows": rows},
+    )
+
+
+# ========================
+# Row level
+# ========================
+def row_hashes(df):
+    """One signed 64-bit hash per row, computed over every column."""
+    hashed = pd.util.hash_pandas_object(df, index=False)
+    return pd.Series(hashed.to_numpy().view("int64"), index=df.index)
+
+
+def filter_changed(df, kind, key):
+    """
+    Drop rows whose hash matches the stored fingerprint for their business ID.
+    Returns (changed_rows, their_hashes).
+    """
+    hashes = row_hashes(df)
+    stored = dict(
+        RowFingerprint.objects
+        .filter(kind=kind, business_id__in=df[key].tolist())
+        .values_list("business_id", "row_hash")
+    )
+
+    changed = [
+        stored.get(business_id) != row_hash
+        for business_id, row_hash in zip(df[key].tolist(), hashes.tolist())
+    ]
+    return df[changed], hashes[changed]
+
+
+def record_row_hashes(kind, business_ids, hashes):
+    RowFingerprint.objects.bulk_create(
+        [
+            RowFingerprint(kind=kind, business_id=business_id, row_hash=row_hash)
+            for business_id, row_hash in zip(business_ids, hashes)
+        ],
+        update_conflicts=True,
+        unique_fields=["kind", "business_id"],
+        update_fields=["row_hash", "updated_at"],
+    )
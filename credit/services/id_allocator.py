@@ -0,0 +1,108 @@
+# credit/services/id_allocator.py
+import os
+import threading
+from collections import deque
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Max
+
+
+class BusinessIdAllocator:
+    """
+    Hands out business IDs (customer_id / loan_id) from a PostgreSQL
+    sequence. nextval() never blocks other transactions, so concurrent
+    workers no longer race on MAX(...) + 1.
+
+    With CREDIT_ID_BLOCK_SIZE > 1 each process reserves a block of IDs in
+    one round trip and serves inserts from it until the block runs out.
+    IDs stay unique but are no longer strictly increasing across workers.
+    Databases without sequences fall back to MAX(...) + 1.
+    """
+
+    def __init__(self, model_label, field, sequence):
+        self.model_label = model_label
+        self.field = field
+        self.sequence = sequence
+        self._lock = threading.Lock()
+        self._reserved = deque()
+        self._pid = os.getpid()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def next_id(self):
+        connection = connections[router.db_for_write(self.model)]
+        if connection.vendor != "postgresql":
+            return self._next_from_max()
+
+        block_size = getattr(settings, "CREDIT_ID_BLOCK_SIZE", 1)
+        if block_size <= 1:
+            return self._fetch(connection, 1)[0]
+
+        with self._lock:
+            # A forked worker must not reuse IDs reserved by its parent
+            if self._pid != os.getpid():
+                self._reserved.clear()
+                self._pid = os.getpid()
+            if not self._reserved:
+                self._reserved.extend(self._fetch(connection, block_size))
+            return self._reserved.popleft()
+
+    def _fetch(self, connection, count):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                [self.sequence, count],
+            )
+            return sorted(row[0] for row in cursor.fetchall())
+
+    def _next_from_max(self):
+        last_id = self.model.objects.aggregate(max_id=Max(self.field))["max_id"]
+        return 1 if last_id is None else last_id + 1
+
+    def sync(self):
+        """
+        Move the sequence past IDs inserted explicitly (e.g. by ingestion)
+        so later allocations cannot collide with them.
+        """
+        model = self.model
+        connection = connections[router.db_for_write(model)]
+        if connection.vendor != "postgresql":
+            return
+
+        with self._lock:
+            self._reserved.clear()
+
+        table = connection.ops.quote_name(model._meta.db_table)
+        column = connection.ops.quote_name(self.field)
+        sequence = connection.ops.quote_name(self.sequence)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT setval(%s, GREATEST(used, 1), used >= 1)
+                FROM (
+                    SELECT GREATEST(
+                        (SELECT COALESCE(MAX({column}), 0) FROM {table}),
+                        (SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END
+                         FROM {sequence})
+                    ) AS used
+                ) AS current
+                """,
+                [self.sequence],
+            )
+
+
+customer_ids = BusinessIdAllocator(
+    "credit.Customer", "customer_id", "credit_customer_business_id_seq"
+)
+loan_ids = BusinessIdAllocator(
+    "credit.Loan", "loan_id", "credit_loan_business_id_seq"
+)
+
+
+def sync_id_sequences():
+    customer_ids.sync()
+    loan_ids.sync()
@@ -0,0 +1,68 @@
+# credit/services/idempotency.py
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from credit.models import IdempotencyKey
+
+MAX_KEY_LENGTH = IdempotencyKey._meta.get_field("key").max_length
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different request."""
+
+
+def request_fingerprint(payload):
+    encoded = json.dumps(payload, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def expiry_cutoff():
+    """Keys stored before this are forgotten (CREDIT_IDEMPOTENCY_TTL_HOURS)."""
+    return timezone.now() - timedelta(hours=getattr(settings, "CREDIT_IDEMPOTENCY_TTL_HOURS", 24))
+
+
+def find_replay(key, fingerprint):
+    """Stored (status_code, body) for key, or None if the key is new or expired."""
+    record = IdempotencyKey.objects.filter(key=key).first()
+    if record is None:
+        return None
+    if record.created_at < expiry_cutoff():
+        # Expired but not pruned yet: free the key for this request
+        record.delete()
+        return None
+    if record.request_hash != fingerprint:
+        raise IdempotencyConflict(key)
+    return record.status_code, record.response_body
+
+
+def store_response(key, fingerprint, status_code, body):
+    """
+    Persist a response; call inside the transaction that produced it.
+    Raises IdempotencyConflict if the key was committed concurrently by a
+    request for another customer.
+    """
+    body = json.loads(json.dumps(body, cls=DjangoJSONEncoder))
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(
+                key=key,
+                request_hash=fingerprint,
+                status_code=status_code,
+                response_body=body,
+            )
+    except IntegrityError as e:
+        # Only the unique key can be violated by this insert
+        raise IdempotencyConflict(key) from e
+    return body
+
+
+def prune_idempotency_keys():
+    """Delete expired keys. Returns the number deleted."""
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=expiry_cutoff()).delete()
+    return deleted
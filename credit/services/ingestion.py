@@ -1,59 +1,125 @@
 # credit/services/ingestion.py
+import logging
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
 import pandas as pd
+from django.conf import settings
 from credit.models import Customer, Loan
-from django.db import connections
-from django.db.utils import OperationalError
+from credit.services.archive import restore_archived_loans
+from credit.services.credit_summary import (
+    ensure_summaries,
+    lock_customers,
+    rebuild_summaries,
+    touch_summaries,
+)
+from credit.services.fingerprints import (
+    already_ingested,
+    file_sha256,
+    filter_changed,
+    record_file,
+    record_row_hashes,
+)
+from credit.services.id_allocator import sync_id_sequences
+from credit.services.score_cache import credit_cache
+from credit.services.sources import iter_source_batches, read_source, read_source_range
+from django.db import transaction
 import time
 
+logger = logging.getLogger(__name__)
+
+CUSTOMER_FILE = "static/customer_data.xlsx"
+LOAN_FILE = "static/loan_data.xlsx"
+
+CUSTOMER_FIELDS = [
+    "first_name",
+    "last_name",
+    "age",
+    "phone_number",
+    "monthly_salary",
+    "approved_limit",
+    "current_debt",
+]
+
+LOAN_FIELDS = [
+    "customer_id",
+    "loan_amount",
+    "tenure",
+    "interest_rate",
+    "monthly_repayment",
+    "emis_paid_on_time",
+    "start_date",
+    "end_date",
+    "is_active",
+]
+
+LOAN_COLUMN_MAPPING = {
+    "monthly_payment": "monthly_repayment",
+    "em_is_paid_on_time": "emis_paid_on_time",
+    "date_of_approval": "start_date",
+}
+
+
 def normalize_columns(df):
-    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-    return df
+    """Copy of df with snake_case column names; the caller's frame is left untouched."""
+    return df.rename(columns=lambda c: str(c).strip().lower().replace(" ", "_"))
+
+
+def default_batch_size():
+    return getattr(settings, "CREDIT_INGEST_BATCH_SIZE", 1000)
+
+
+# ========================
+# Vectorized column coercion
+# ========================
+def coerce_int(series, default=0):
+    return pd.to_numeric(series, errors="coerce").fillna(default).round().astype("int64")
+
+
+def coerce_float(series, default=0.0):
+    return pd.to_numeric(series, errors="coerce").fillna(default).astype("float64")
+
+
+def coerce_date(series):
+    values = pd.to_datetime(series, errors="coerce")
+    return values.dt.date.astype(object).where(values.notna(), None)
+
+
+def coerce_phone(series):
+    return series.astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
 
-def safe_date(val):
-    if pd.isna(val):
-        return None
-    if isinstance(val, pd.Timestamp):
-        return val.date()
-    return val
-
-def load_initial_data():
-    # ========================
-    # Load customer data
-    # ========================
-    df_customers = pd.read_excel("static/customer_data.xlsx")
-    df_customers = normalize_columns(df_customers)
-
-    if "current_debt" not in df_customers.columns:
-        df_customers["current_debt"] = 0
-
-    for _, row in df_customers.iterrows():
-        Customer.objects.update_or_create(
-            customer_id=row["customer_id"],
-            defaults={
-                "first_name": row["first_name"],
-                "last_name": row["last_name"],
-                "age": row["age"],
-                "phone_number": str(row["phone_number"]),
-                "monthly_salary": row["monthly_salary"],
-                "approved_limit": row["approved_limit"],
-                "current_debt": row["current_debt"],
-            }
-        )
-    print(f"Loaded {df_customers.shape[0]} customers")
-
-    # ========================
-    # Load loan data
-    # ========================
-    df_loans = pd.read_excel("static/loan_data.xlsx")
-    df_loans = normalize_columns(df_loans)
-
-    column_mapping = {
-        "monthly_payment": "monthly_repayment",
-        "em_is_paid_on_time": "emis_paid_on_time",
-        "date_of_approval": "start_date",
-    }
 
-    df_loans = df_loans.rename(columns={k: v for k, v in column_mapping.items() if k in df_loans.columns})
+def prepare_customer_frame(df):
+    """Normalize a raw customer sheet into model-ready columns."""
+    df = normalize_columns(df)
+
+    if "current_debt" not in df.columns:
+        df["current_debt"] = 0
+    if "age" not in df.columns:
+        df["age"] = 30
+
+    df = df.dropna(subset=["customer_id"])
+    df = df.assign(
+        customer_id=coerce_int(df["customer_id"]),
+        first_name=df["first_name"].astype(str),
+        last_name=df["last_name"].astype(str),
+        age=coerce_int(df["age"], default=30),
+        phone_number=coerce_phone(df["phone_number"]),
+        monthly_salary=coerce_int(df["monthly_salary"]),
+        approved_limit=coerce_int(df["approved_limit"]),
+        current_debt=coerce_int(df["current_debt"]),
+    )
+    df = df.drop_duplicates(subset="customer_id", keep="last")
+    return df[["customer_id", *CUSTOMER_FIELDS]]
+
+
+def prepare_loan_frame(df):
+    """Normalize a raw loan sheet into model-ready columns."""
+    df = normalize_columns(df)
+    df = df.rename(columns={k: v for k, v in LOAN_COLUMN_MAPPING.items() if k in df.columns})
 
     optional_columns_defaults = {
         "monthly_repayment": 0,
@@ -64,50 +130,266 @@ def load_initial_data():
     }
 
     for col, default in optional_columns_defaults.items():
-        if col not in df_loans.columns:
-            df_loans[col] = default
-
-    for date_col in ["start_date", "end_date"]:
-        if date_col in df_loans.columns:
-            df_loans[date_col] = df_loans[date_col].apply(safe_date)
-
-    for _, row in df_loans.iterrows():
-        try:
-            customer = Customer.objects.get(customer_id=row["customer_id"])
-            Loan.objects.update_or_create(
-                loan_id=row["loan_id"],
-                defaults={
-                    "loan_amount": row["loan_amount"],
-                    "tenure": row["tenure"],
-                    "interest_rate": row["interest_rate"],
-                    "monthly_repayment": row["monthly_repayment"],
-                    "emis_paid_on_time": row["emis_paid_on_time"],
-                    "start_date": row["start_date"],
-                    "end_date": row["end_date"],
-                    "is_active": row["is_active"],
-                    "customer": customer,
-                }
+        if col not in df.columns:
+            df[col] = default
+
+    df = df.dropna(subset=["customer_id", "loan_id"])
+    df = df.assign(
+        customer_id=coerce_int(df["customer_id"]),
+        loan_id=coerce_int(df["loan_id"]),
+        loan_amount=coerce_int(df["loan_amount"]),
+        tenure=coerce_int(df["tenure"]),
+        interest_rate=coerce_float(df["interest_rate"]),
+        monthly_repayment=coerce_float(df["monthly_repayment"]),
+        emis_paid_on_time=coerce_int(df["emis_paid_on_time"]),
+        start_date=coerce_date(df["start_date"]),
+        end_date=coerce_date(df["end_date"]),
+        is_active=df["is_active"].fillna(True).astype(bool),
+    )
+
+    undated = df["start_date"].isna() | df["end_date"].isna()
+    if undated.any():
+        logger.warning("Skipping %d loans without start/end date", int(undated.sum()))
+        df = df[~undated]
+
+    df = df.drop_duplicates(subset="loan_id", keep="last")
+    return df[["loan_id", *LOAN_FIELDS]]
+
+
+# ========================
+# Batched upserts
+# ========================
+def upsert_customers(df, batch_size=None):
+    """
+    Upsert a prepared customer frame with INSERT ... ON CONFLICT
+    (customer_id) DO UPDATE, one statement per batch.
+    Returns the number of rows written.
+    """
+    batch_size = batch_size or default_batch_size()
+    written = 0
+
+    for start in range(0, len(df), batch_size):
+        records = df.iloc[start:start + batch_size].to_dict("records")
+        customers = Customer.objects.bulk_create(
+            [Customer(**record) for record in records],
+            update_conflicts=True,
+            unique_fields=["customer_id"],
+            update_fields=CUSTOMER_FIELDS,
+        )
+        # Salary / limit changes bypass the post_save signal here
+        pks = [c.pk for c in customers if c.pk is not None]
+        credit_cache.invalidate(pks)
+        ensure_summaries(pks)
+        touch_summaries(pks)
+        written += len(records)
+
+    return written
+
+
+def upsert_loans(df, batch_size=None, customer_map=None, touched_customers=None):
+    """
+    Upsert a prepared loan frame in batches keyed on loan_id. Customer
+    foreign keys are resolved through one prefetched customer_id -> pk map;
+    loans whose customer is unknown are skipped. Each batch refreshes the
+    credit summaries of the customers it touched in the same transaction,
+    and adds their pks to touched_customers when a set is given.
+    Returns (written, skipped).
+    """
+    batch_size = batch_size or default_batch_size()
+    if customer_map is None:
+        customer_map = dict(Customer.objects.values_list("customer_id", "pk"))
+
+    df = df.assign(customer_id=df["customer_id"].map(customer_map))
+    unknown = df["customer_id"].isna()
+    skipped = int(unknown.sum())
+    if skipped:
+        logger.warning("Skipping %d loans with unknown customers", skipped)
+    df = df[~unknown].astype({"customer_id": "int64"})
+
+    written = 0
+    for start in range(0, len(df), batch_size):
+        records = df.iloc[start:start + batch_size].to_dict("records")
+        loan_ids = [record["loan_id"] for record in records]
+
+        with transaction.atomic():
+            # Customers losing a loan to another customer need a refresh too
+            touched = set(
+                Loan.objects.filter(loan_id__in=loan_ids).values_list("customer_id", flat=True)
+            )
+            touched.update(record["customer_id"] for record in records)
+            touched.update(restore_archived_loans(loan_ids))
+            # Lock before the loan insert takes FK locks in arbitrary order;
+            # parallel shards sharing customers would otherwise deadlock
+            touched = lock_customers(touched)
+
+            Loan.objects.bulk_create(
+                [Loan(**record) for record in records],
+                update_conflicts=True,
+                unique_fields=["loan_id"],
+                update_fields=LOAN_FIELDS,
             )
-        except Customer.DoesNotExist:
-            print(f"Customer {row['customer_id']} not found, skipping loan {row['loan_id']}")
+            rebuild_summaries(touched)
+
+        if touched_customers is not None:
+            touched_customers.update(touched)
+        written += len(records)
+
+    return written, skipped
+
+
+# ========================
+# Source pipeline
+# ========================
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class IngestProgress:
+    """Per-batch progress, throughput and memory reporting."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.batches = 0
+        self.rows = 0
+        self.written = 0
+        self.skipped = 0
+        self.started = time.monotonic()
+
+    def update(self, rows, written, skipped=0):
+        self.batches += 1
+        self.rows += rows
+        self.written += written
+        self.skipped += skipped
+
+        elapsed = time.monotonic() - self.started
+        rss = peak_rss_mb()
+        logger.info(
+            "%s batch %d: %d rows (%d total), %.0f rows/s, peak RSS %s",
+            self.kind,
+            self.batches,
+            rows,
+            self.rows,
+            self.rows / elapsed if elapsed else 0,
+            f"{rss:.1f} MB" if rss is not None else "n/a",
+        )
+
+    def summary(self):
+        elapsed = time.monotonic() - self.started
+        return {
+            "kind": self.kind,
+            "batches": self.batches,
+            "rows": self.rows,
+            "written": self.written,
+            "skipped": self.skipped,
+            "unchanged": self.rows - self.written - self.skipped,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows / elapsed, 1) if elapsed else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+
+def ingest_source(path, kind, batch_size=None, streaming=None, delta=None):
+    """
+    Ingest one customer or loan source file (kind is "customers" or "loans").
+
+    In streaming mode (CREDIT_INGEST_STREAMING by default) the file is read
+    in batch_size chunks and each chunk is written before the next one is
+    read, so peak memory does not grow with file size. Otherwise the whole
+    file is loaded first.
+
+    In delta mode (CREDIT_INGEST_DELTA by default) a file whose content hash
+    was already ingested is skipped outright, and within a file only rows
+    whose hash differs from the stored fingerprint are written.
+    Returns IngestProgress.summary().
+    """
+    batch_size = batch_size or default_batch_size()
+    if streaming is None:
+        streaming = getattr(settings, "CREDIT_INGEST_STREAMING", False)
+    if delta is None:
+        delta = getattr(settings, "CREDIT_INGEST_DELTA", True)
+    progress = IngestProgress(kind)
+
+    if delta:
+        digest = file_sha256(path)
+        if already_ingested(kind, digest):
+            logger.info("%s file %s unchanged since last ingestion, skipping", kind, path)
+            return progress.summary()
+
+    if streaming:
+        batches = iter_source_batches(path, batch_size)
+    else:
+        batches = [read_source(path)]
+
+    ingest_batches(batches, kind, batch_size, delta, progress)
+
+    if delta:
+        record_file(kind, digest, path, progress.rows)
+
+    return progress.summary()
+
+
+def ingest_source_range(path, kind, start, stop, batch_size=None, delta=None):
+    """
+    Ingest data rows [start, stop) of a source file. Used by sharded
+    ingestion; file-level fingerprints are left to the coordinator.
+    Returns IngestProgress.summary() plus, for loans, the pks of the
+    customers whose summaries the shard rebuilt ("touched_customers").
+    """
+    batch_size = batch_size or default_batch_size()
+    if delta is None:
+        delta = getattr(settings, "CREDIT_INGEST_DELTA", True)
 
-    print(f"Loaded {df_loans.shape[0]} loans")
+    progress = IngestProgress(f"{kind}[{start}:{stop}]")
+    touched = set()
+    ingest_batches([read_source_range(path, start, stop)], kind, batch_size, delta, progress, touched)
+    return {**progress.summary(), "touched_customers": sorted(touched)}
 
 
-def load_initial_data_safe():
+def ingest_batches(batches, kind, batch_size, delta, progress, touched_customers=None):
     """
-    Wait until DB is ready, then run load_initial_data once.
-    Handles autoreload / missing tables.
+    Prepare, delta-filter and upsert raw source DataFrames one by one.
+    touched_customers collects the customers whose summaries were rebuilt.
     """
-    max_attempts = 10
-    for attempt in range(max_attempts):
-        try:
-            # Check if the DB connection works
-            db_conn = connections['default']
-            db_conn.ensure_connection()
-            # Run the loader
-            load_initial_data()
-            break
-        except OperationalError:
-            print("Database not ready, retrying in 3 seconds...")
-            time.sleep(3)
\ No newline at end of file
+    if kind not in ("customers", "loans"):
+        raise ValueError(f"Unknown source kind: {kind}")
+    if kind == "loans":
+        customer_map = dict(Customer.objects.values_list("customer_id", "pk"))
+
+    for raw in batches:
+        if raw.empty:
+            continue
+        if kind == "customers":
+            frame, key = prepare_customer_frame(raw), "customer_id"
+        else:
+            frame, key = prepare_loan_frame(raw), "loan_id"
+
+        if delta:
+            frame, hashes = filter_changed(frame, kind, key)
+
+        if kind == "customers":
+            written, skipped = upsert_customers(frame, batch_size), 0
+            recorded = frame
+        else:
+            written, skipped = upsert_loans(frame, batch_size, customer_map, touched_customers)
+            # Loans skipped for unknown customers are retried next run
+            recorded = frame[frame["customer_id"].isin(customer_map.keys())]
+
+        if delta:
+            record_row_hashes(kind, recorded[key].tolist(), hashes[recorded.index].tolist())
+
+        progress.update(len(raw), written, skipped)
+
+
+def ingest_files(customer_file=CUSTOMER_FILE, loan_file=LOAN_FILE, batch_size=None, streaming=None, delta=None):
+    """
+    Load both source files through the bulk upsert engine.
+    Returns a dict of per-file summaries.
+    """
+    customers = ingest_source(customer_file, "customers", batch_size, streaming, delta)
+    loans = ingest_source(loan_file, "loans", batch_size, streaming, delta)
+    sync_id_sequences()
+
+    return {"customers": customers, "loans": loans}
@@ -0,0 +1,204 @@
+# credit/services/metrics.py
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Per-request phase timings; None outside an instrumented request
+_current = contextvars.ContextVar("credit_request_timings", default=None)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class RequestTimings:
+    """SQL query count, DB time and named phase durations for one request."""
+
+    __slots__ = ("queries", "db_seconds", "phases", "active")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.phases = {}
+        self.active = set()
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+def begin_request():
+    """Start collecting timings for the current context. Returns (timings, token)."""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current_timings():
+    return _current.get()
+
+
+@contextmanager
+def timed_block(phase):
+    """Add the block's duration to `phase` of the current request, if any."""
+    timings = _current.get()
+    # Re-entering a phase (nested serializers, recursion) must not double count
+    if timings is None or phase in timings.active:
+        yield
+        return
+    timings.active.add(phase)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.active.discard(phase)
+        timings.add(phase, time.perf_counter() - started)
+
+
+def timed(phase):
+    """Decorator form of timed_block; a plain call outside instrumented requests."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with timed_block(phase):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def query_recorder(timings):
+    """A connection.execute_wrapper() callable counting queries and DB time."""
+
+    def record(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            timings.queries += 1
+            timings.db_seconds += time.perf_counter() - started
+
+    return record
+
+
+# ========================
+# Prometheus registry
+# ========================
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    def __init__(self, name, documentation, label_names, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # One slot per bucket plus +Inf, then sum
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for label_values, series in items:
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                labels = _labels((*self.label_names, "le"), (*label_values, bound))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {series[-1]}")
+            lines.append(f"{self.name}_count{labels} {series[-2]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, documentation, label_names):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    In-process request metrics keyed by URL name. Each worker process keeps
+    its own registry, so a scrape reports the worker that answered it.
+    """
+
+    def __init__(self):
+        labels = ("url_name", "method")
+        self.requests = Counter("credit_requests_total", "Requests handled.", (*labels, "status"))
+        self.duration = Histogram(
+            "credit_request_duration_seconds", "Total request time.", labels, DURATION_BUCKETS
+        )
+        self.db = Histogram(
+            "credit_request_db_seconds", "Time spent executing SQL per request.", labels, DURATION_BUCKETS
+        )
+        self.queries = Histogram(
+            "credit_request_queries", "SQL queries per request.", labels, QUERY_BUCKETS
+        )
+        self.phases = Histogram(
+            "credit_request_phase_seconds",
+            "Time per instrumented phase (view, serializer, eligibility, emi).",
+            (*labels, "phase"),
+            DURATION_BUCKETS,
+        )
+        # Callables returning extra exposition lines, e.g. connection pool gauges
+        self.collectors = []
+
+    def observe(self, url_name, method, status, total, timings):
+        labels = (url_name, method)
+        self.requests.inc((*labels, str(status)))
+        self.duration.observe(labels, total)
+        self.db.observe(labels, timings.db_seconds)
+        self.queries.observe(labels, timings.queries)
+        for phase, seconds in timings.phases.items():
+            self.phases.observe((*labels, phase), seconds)
+
+    def render(self):
+        lines = []
+        for metric in (self.requests, self.duration, self.db, self.queries, self.phases):
+            lines.extend(metric.render())
+        for collect in self.collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
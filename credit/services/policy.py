@@ -0,0 +1,240 @@
+# credit/services/policy.py
+import logging
+import threading
+import time
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from credit.models import CreditPolicy
+from credit.services.emi import calculate_emi, calculate_emi_array
+
+logger = logging.getLogger(__name__)
+
+# Version 0: the rules as originally hard-coded in views.py
+DEFAULT_POLICY = {
+    "base_score": 50,
+    "on_time_weight": 50,
+    "loan_count_penalty": 5,
+    "current_year_penalty": 5,
+    "min_score": 0,
+    "max_score": 100,
+    # Active principal above approved_limit * ratio: reject / score 0
+    "debt_limit_ratio": 1,
+    # Active EMIs above monthly_salary * cap: reject / cap the score
+    "emi_salary_cap": 0.5,
+    "emi_cap_score_ceiling": 10,
+    # Score must be strictly above min_score; first matching slab wins,
+    # no match means rejection. floor_rate None keeps the requested rate.
+    "slabs": [
+        {"min_score": 50, "floor_rate": None},
+        {"min_score": 30, "floor_rate": 12},
+        {"min_score": 10, "floor_rate": 16},
+    ],
+}
+
+NUMERIC_KEYS = [key for key in DEFAULT_POLICY if key != "slabs"]
+
+
+class CompiledPolicy:
+    """
+    Flat evaluation plan for one policy version: plain attributes and a
+    tuple of (min_score, floor_rate) slabs, so scoring does no lookups or
+    parsing per request.
+    """
+
+    __slots__ = ("version", "slabs", *NUMERIC_KEYS)
+
+    def __init__(self, version, config):
+        self.version = version
+        for key in NUMERIC_KEYS:
+            setattr(self, key, config[key])
+        self.slabs = tuple(
+            sorted(
+                ((slab["min_score"], slab["floor_rate"]) for slab in config["slabs"]),
+                key=lambda slab: slab[0],
+                reverse=True,
+            )
+        )
+
+    # ---- Scalar path ----
+    def raw_score(self, profile):
+        score = self.base_score
+        if profile["loan_count"]:
+            on_time_ratio = profile["on_time_emis"] / profile["loan_count"]
+            score += on_time_ratio * self.on_time_weight
+        score -= profile["loan_count"] * self.loan_count_penalty
+        score -= profile["current_year_loans"] * self.current_year_penalty
+        return max(self.min_score, min(self.max_score, score))
+
+    def over_debt_limit(self, customer, profile):
+        return profile["active_principal"] > customer.approved_limit * self.debt_limit_ratio
+
+    def over_emi_cap(self, customer, profile):
+        return profile["active_emi"] > self.emi_salary_cap * customer.monthly_salary
+
+    def credit_score(self, customer, profile):
+        if self.over_debt_limit(customer, profile):
+            return 0
+        score = self.raw_score(profile)
+        if self.over_emi_cap(customer, profile):
+            score = min(score, self.emi_cap_score_ceiling)
+        return score
+
+    def evaluate(self, customer, profile, loan_amount, interest_rate, tenure):
+        """(approved, corrected_rate, monthly_installment) for one request."""
+        if self.over_debt_limit(customer, profile) or self.over_emi_cap(customer, profile):
+            return False, interest_rate, 0
+
+        score = self.raw_score(profile)
+        for min_score, floor_rate in self.slabs:
+            if score > min_score:
+                corrected_rate = interest_rate if floor_rate is None else max(interest_rate, floor_rate)
+                break
+        else:
+            return False, round(interest_rate, 2), 0
+
+        monthly_installment = calculate_emi(loan_amount, corrected_rate, tenure)
+        return True, round(corrected_rate, 2), monthly_installment
+
+    # ---- Vectorized path ----
+    def raw_score_arrays(self, loan_count, on_time, this_year):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            on_time_ratio = np.where(loan_count > 0, on_time / loan_count, 0.0)
+        score = (
+            self.base_score
+            + on_time_ratio * self.on_time_weight
+            - loan_count * self.loan_count_penalty
+            - this_year * self.current_year_penalty
+        )
+        return np.clip(score, self.min_score, self.max_score)
+
+    def credit_score_arrays(self, limit, salary, principal, emi_total, loan_count, on_time, this_year):
+        """Array version of credit_score."""
+        score = self.raw_score_arrays(loan_count, on_time, this_year)
+        score = np.where(emi_total > self.emi_salary_cap * salary, np.minimum(score, self.emi_cap_score_ceiling), score)
+        return np.where(principal > limit * self.debt_limit_ratio, 0, score)
+
+    def slab_labels(self, score):
+        """Name of the approval slab each score falls in (">50", ">30", ...), else "rejected"."""
+        conditions = [score > min_score for min_score, _ in self.slabs]
+        choices = [f">{min_score}" for min_score, _ in self.slabs]
+        return np.select(conditions, choices, default="rejected")
+
+    def evaluate_arrays(self, limit, salary, principal, emi_total, loan_count,
+                        on_time, this_year, loan_amount, interest_rate, tenure):
+        """
+        Array version of evaluate. Returns (rejected, approved, corrected, emi):
+        rejected marks the hard debt/EMI rules, approved the final decision.
+        """
+        rejected = (principal > limit * self.debt_limit_ratio) | (emi_total > self.emi_salary_cap * salary)
+        score = self.raw_score_arrays(loan_count, on_time, this_year)
+
+        conditions = [score > min_score for min_score, _ in self.slabs]
+        choices = [
+            interest_rate if floor_rate is None else np.maximum(interest_rate, floor_rate)
+            for _, floor_rate in self.slabs
+        ]
+        corrected = np.select(conditions, choices, default=interest_rate)
+        approved = ~rejected & np.logical_or.reduce(conditions) if conditions else np.zeros_like(rejected)
+
+        emi = calculate_emi_array(loan_amount, corrected, tenure)
+        return rejected, approved, corrected, emi
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def compile_policy(config, version=0):
+    """Validate a (possibly partial) policy config and compile it."""
+    if config is not None and not isinstance(config, dict):
+        raise ValueError("Policy config must be a mapping")
+    merged = {**DEFAULT_POLICY, **(config or {})}
+
+    unknown = set(merged) - set(DEFAULT_POLICY)
+    if unknown:
+        raise ValueError(f"Unknown policy keys: {', '.join(sorted(unknown))}")
+    for key in NUMERIC_KEYS:
+        if not _is_number(merged[key]):
+            raise ValueError(f"Policy key {key} must be a number")
+
+    if not isinstance(merged["slabs"], list):
+        raise ValueError("slabs must be a list")
+    slabs = []
+    for slab in merged["slabs"]:
+        if not isinstance(slab, dict) or "min_score" not in slab:
+            raise ValueError("Each slab needs a min_score")
+        if set(slab) - {"min_score", "floor_rate"}:
+            raise ValueError("Slabs only take min_score and floor_rate")
+        slab = {"floor_rate": None, **slab}
+        if not _is_number(slab["min_score"]):
+            raise ValueError("Slab min_score must be a number")
+        if slab["floor_rate"] is not None and not _is_number(slab["floor_rate"]):
+            raise ValueError("Slab floor_rate must be a number or null")
+        slabs.append(slab)
+
+    return CompiledPolicy(version, {**merged, "slabs": slabs})
+
+
+# ========================
+# Active policy with hot reload
+# ========================
+_lock = threading.Lock()
+_active = compile_policy(DEFAULT_POLICY)
+_checked_at = float("-inf")
+
+
+def get_policy():
+    """
+    The active compiled policy. The active version number is re-checked at
+    most every CREDIT_POLICY_RELOAD_INTERVAL seconds and the config is only
+    recompiled when that version changes.
+    """
+    global _active, _checked_at
+
+    interval = getattr(settings, "CREDIT_POLICY_RELOAD_INTERVAL", 30)
+    if time.monotonic() - _checked_at < interval:
+        return _active
+
+    with _lock:
+        if time.monotonic() - _checked_at < interval:
+            return _active
+        try:
+            record = (
+                CreditPolicy.objects.filter(is_active=True)
+                .order_by("-version")
+                .values("version", "config")
+                .first()
+            )
+        except Exception:
+            logger.warning("Could not load credit policy, keeping version %s", _active.version, exc_info=True)
+            record = {"version": _active.version, "config": None}
+
+        if record is None:
+            record = {"version": 0, "config": DEFAULT_POLICY}
+        if record["version"] != _active.version:
+            try:
+                _active = compile_policy(record["config"], record["version"])
+                logger.info("Loaded credit policy version %s", _active.version)
+            except ValueError:
+                logger.error(
+                    "Credit policy version %s is invalid, keeping version %s",
+                    record["version"], _active.version, exc_info=True,
+                )
+        _checked_at = time.monotonic()
+    return _active
+
+
+async def aget_policy():
+    """get_policy() for async views; only touches the database when a re-check is due."""
+    if time.monotonic() - _checked_at < getattr(settings, "CREDIT_POLICY_RELOAD_INTERVAL", 30):
+        return _active
+    return await sync_to_async(get_policy)()
+
+
+def expire_policy():
+    """Force the next get_policy() call to re-check the active version."""
+    global _checked_at
+    _checked_at = float("-inf")
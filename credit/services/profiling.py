@@ -0,0 +1,217 @@
+# credit/services/profiling.py
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+
+# Module groups for profile_report --only
+FUNCTION_GROUPS = {
+    "views": ("credit/views.py", "credit/async_views.py"),
+    "serializers": ("credit/serializers.py", "rest_framework/serializers.py", "rest_framework/fields.py"),
+    "services": ("credit/services/",),
+    "orm": ("django/db/",),
+}
+
+
+def profile_dir():
+    return Path(getattr(settings, "CREDIT_PROFILE_DIR", "profiles"))
+
+
+def frame_label(code):
+    """file:function with the path cut down to its package-relative part."""
+    filename = code.co_filename.replace(os.sep, "/")
+    for marker in ("/site-packages/", "/dist-packages/", "/lib/python"):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    else:
+        cwd = os.getcwd().replace(os.sep, "/") + "/"
+        if filename.startswith(cwd):
+            filename = filename[len(cwd):]
+    return f"{filename}:{code.co_firstlineno}({code.co_name})"
+
+
+# ========================
+# Sampling profiler
+# ========================
+class StackSampler:
+    """
+    One background thread that snapshots the stacks of registered request
+    threads every `interval` seconds. Cheap enough to leave on for every
+    request, so the slow tail can be kept after the fact.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, thread_id):
+        collector = Counter()
+        with self._lock:
+            self._targets[thread_id] = collector
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="credit-stack-sampler", daemon=True)
+                self._thread.start()
+        return collector
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self._targets.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                targets = dict(self._targets)
+            if not targets:
+                continue
+            frames = sys._current_frames()
+            for thread_id, collector in targets.items():
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    # Folded format: root first, leaf last
+                    collector[";".join(reversed(stack))] += 1
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler():
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = StackSampler(getattr(settings, "CREDIT_PROFILE_SAMPLE_INTERVAL", 0.005))
+        return _sampler
+
+
+# cProfile allows one active profiler per process (sys.monitoring on 3.12+)
+cprofile_lock = threading.Lock()
+
+
+def new_cprofile():
+    return cProfile.Profile()
+
+
+# ========================
+# Storage
+# ========================
+def save_profile(meta, profiler=None, stacks=None):
+    """
+    Write a captured profile and its request metadata to profile_dir():
+    <id>.prof (cProfile) or <id>.stacks.json (sampled), plus <id>.json.
+    Returns the metadata path.
+    """
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+    if profiler is not None:
+        profiler.dump_stats(directory / f"{name}.prof")
+        meta["profile"] = f"{name}.prof"
+    else:
+        (directory / f"{name}.stacks.json").write_text(json.dumps(dict(stacks or {})))
+        meta["profile"] = f"{name}.stacks.json"
+
+    meta["captured_at"] = datetime.now(timezone.utc).isoformat()
+    path = directory / f"{name}.json"
+    path.write_text(json.dumps(meta, indent=2))
+    return path
+
+
+# ========================
+# Aggregation
+# ========================
+def _matches(label, groups):
+    if not groups:
+        return True
+    return any(pattern in label for group in groups for pattern in FUNCTION_GROUPS[group])
+
+
+def load_profiles(directory=None, since=None):
+    """Metadata dicts of the captured profiles, oldest first."""
+    directory = Path(directory or profile_dir())
+    profiles = []
+    for path in sorted(directory.glob("*.json")):
+        if path.name.endswith(".stacks.json"):
+            continue
+        meta = json.loads(path.read_text())
+        if since and meta.get("captured_at", "") < since:
+            continue
+        meta["_dir"] = str(directory)
+        profiles.append(meta)
+    return profiles
+
+
+def aggregate_profiles(profiles, top=20, groups=()):
+    """
+    Top functions across captured profiles. cProfile captures are merged
+    with pstats and ranked by cumulative time; sampled captures are ranked
+    by inclusive samples (stacks the function appears in) with self samples
+    (stacks it is the leaf of) alongside.
+    """
+    cprofile_paths = []
+    inclusive, exclusive = Counter(), Counter()
+    sample_total = 0
+
+    for meta in profiles:
+        path = Path(meta["_dir"]) / meta["profile"]
+        if not path.exists():
+            continue
+        if path.suffix == ".prof":
+            cprofile_paths.append(str(path))
+            continue
+        for stack, count in json.loads(path.read_text()).items():
+            frames = stack.split(";")
+            sample_total += count
+            exclusive[frames[-1]] += count
+            for label in set(frames):
+                inclusive[label] += count
+
+    report = {"profiles": len(profiles)}
+
+    if cprofile_paths:
+        stats = pstats.Stats(*cprofile_paths)
+        rows = []
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            label = f"{filename.replace(os.sep, '/')}:{line}({name})"
+            if _matches(label, groups):
+                rows.append({
+                    "function": label,
+                    "calls": calls,
+                    "tottime_s": round(tottime, 4),
+                    "cumtime_s": round(cumtime, 4),
+                })
+        rows.sort(key=lambda row: row["cumtime_s"], reverse=True)
+        report["cprofile"] = rows[:top]
+
+    if sample_total:
+        rows = [
+            {
+                "function": label,
+                "inclusive_pct": round(100 * count / sample_total, 2),
+                "self_pct": round(100 * exclusive[label] / sample_total, 2),
+                "samples": count,
+            }
+            for label, count in inclusive.items()
+            if _matches(label, groups)
+        ]
+        rows.sort(key=lambda row: row["samples"], reverse=True)
+        report["sampled"] = {"samples": sample_total, "functions": rows[:top]}
+
+    return report
@@ -0,0 +1,87 @@
+# credit/services/query_plans.py
+import re
+
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from credit.models import Customer, Loan
+
+
+def _sample_customer_pk():
+    return Loan.objects.filter(is_active=True).values_list("customer_id", flat=True).first() or 0
+
+
+def _active_sums():
+    return (
+        Loan.objects.filter(customer_id=_sample_customer_pk(), is_active=True)
+        .order_by()
+        .values("customer_id")
+        .annotate(principal=Sum("loan_amount"), emi=Sum("monthly_repayment"))
+    )
+
+
+def _late_loans():
+    from credit.views import LOAN_STATUS_FILTERS
+
+    return Loan.objects.filter(LOAN_STATUS_FILTERS["late"]).order_by("-start_date", "-loan_id")[:100]
+
+
+def _loan_listing():
+    return Loan.objects.order_by("-start_date", "-loan_id")[:100]
+
+
+def _customer_lookup():
+    customer_id = Customer.objects.values_list("customer_id", flat=True).first() or 0
+    return Customer.objects.filter(customer_id=customer_id)
+
+
+# (name, queryset factory, index expected in the plan, whether it should be index-only)
+HOT_QUERIES = [
+    ("active debt / EMI sums for one customer", _active_sums, "loan_active_cover_idx", True),
+    ("late_loans listing", _late_loans, "loan_late_start_idx", False),
+    ("loan listing in cursor order", _loan_listing, "loan_start_loan_id_idx", False),
+    # The unique constraint's index, named by PostgreSQL
+    ("customer lookup by customer_id", _customer_lookup, "credit_customer_customer_id_key", False),
+]
+
+
+def scans_index(plan, index):
+    """True if a plan node actually scans `index` (not just mentions a column)."""
+    pattern = rf"(Index Scan|Index Only Scan) using {re.escape(index)} |Bitmap Index Scan on {re.escape(index)}\b"
+    return re.search(pattern, plan) is not None
+
+
+def explain_hot_queries(analyze=False, disable_seqscan=False):
+    """
+    EXPLAIN each hot query on PostgreSQL and check the plan uses the
+    expected index (and an Index Only Scan where one is expected).
+    disable_seqscan makes the planner show whether the index is usable
+    at all on tables too small for it to be chosen on cost.
+    Returns a list of {name, index, plan, uses_index, index_only, ok}.
+    """
+    if connection.vendor != "postgresql":
+        raise RuntimeError("Query plan checks need PostgreSQL")
+
+    results = []
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            if analyze:
+                cursor.execute("ANALYZE credit_loan")
+                cursor.execute("ANALYZE credit_customer")
+            if disable_seqscan:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+        for name, factory, index, index_only in HOT_QUERIES:
+            plan = factory().explain(analyze=analyze)
+            uses_index = scans_index(plan, index)
+            only = f"Index Only Scan using {index} " in plan
+            scan_ok = only if index_only else True
+            results.append({
+                "name": name,
+                "index": index,
+                "plan": plan,
+                "uses_index": uses_index,
+                "index_only": only,
+                "ok": uses_index and scan_ok,
+            })
+    return results
@@ -0,0 +1,165 @@
+# credit/services/score_cache.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class LocalLRU:
+    """Small thread-safe in-process LRU with a per-entry TTL."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CreditScoreCache:
+    """
+    Two-tier cache of per-customer scoring inputs and credit score.
+
+    Tier 1 is a per-process LRU with a short TTL so hot customers never
+    leave the process; tier 2 is the shared Django cache (Redis in
+    deployment) with CREDIT_SCORE_CACHE_TTL. Entries are dropped from both
+    tiers when the customer's loans change; other processes' LRUs expire
+    within CREDIT_SCORE_CACHE_LOCAL_TTL seconds.
+    """
+
+    def __init__(self):
+        self._local = None
+        self._lock = threading.Lock()
+        self.stats = {"local_hits": 0, "remote_hits": 0, "misses": 0, "invalidations": 0}
+
+    @property
+    def enabled(self):
+        return getattr(settings, "CREDIT_SCORE_CACHE_ENABLED", True)
+
+    @property
+    def local(self):
+        if self._local is None:
+            self._local = LocalLRU(
+                getattr(settings, "CREDIT_SCORE_CACHE_LOCAL_SIZE", 10000),
+                getattr(settings, "CREDIT_SCORE_CACHE_LOCAL_TTL", 5),
+            )
+        return self._local
+
+    @property
+    def remote(self):
+        return caches[getattr(settings, "CREDIT_SCORE_CACHE_ALIAS", "default")]
+
+    def key(self, customer_pk):
+        # Current-year loan counts roll over with the year, and scores
+        # change with the policy version
+        from credit.services.policy import get_policy
+
+        return f"credit:score:{date.today().year}:v{get_policy().version}:{customer_pk}"
+
+    def _count(self, stat, amount=1):
+        with self._lock:
+            self.stats[stat] += amount
+
+    def get(self, customer_pk):
+        """Cached {"profile": ..., "score": ...} for a customer, or None."""
+        if not self.enabled:
+            return None
+
+        key = self.key(customer_pk)
+        entry = self.local.get(key)
+        if entry is not None:
+            self._count("local_hits")
+            return entry
+
+        try:
+            entry = self.remote.get(key)
+        except Exception:
+            logger.warning("Credit score cache unavailable", exc_info=True)
+            entry = None
+
+        if entry is None:
+            self._count("misses")
+            return None
+
+        self._count("remote_hits")
+        self.local.set(key, entry)
+        return entry
+
+    def set(self, customer_pk, profile, score):
+        entry = {"profile": profile, "score": score}
+        if not self.enabled:
+            return entry
+
+        key = self.key(customer_pk)
+        self.local.set(key, entry)
+        try:
+            self.remote.set(key, entry, getattr(settings, "CREDIT_SCORE_CACHE_TTL", 300))
+        except Exception:
+            logger.warning("Credit score cache unavailable", exc_info=True)
+        return entry
+
+    def invalidate(self, customer_pks):
+        keys = [self.key(pk) for pk in customer_pks]
+        if not keys:
+            return
+        for key in keys:
+            self.local.delete(key)
+        try:
+            self.remote.delete_many(keys)
+        except Exception:
+            logger.warning("Credit score cache unavailable", exc_info=True)
+        self._count("invalidations", len(keys))
+
+    def invalidate_on_commit(self, customer_pks):
+        """Invalidate once the current transaction commits (immediately outside one)."""
+        customer_pks = list(customer_pks)
+        transaction.on_commit(lambda: self.invalidate(customer_pks))
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["local_hits"] + stats["remote_hits"] + stats["misses"]
+        stats["hit_ratio"] = (
+            round((stats["local_hits"] + stats["remote_hits"]) / lookups, 4) if lookups else None
+        )
+        stats["local_entries"] = len(self.local)
+        return stats
+
+
+credit_cache = CreditScoreCache()
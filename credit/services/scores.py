@@ -0,0 +1,178 @@
+# credit/services/scores.py
+import logging
+from datetime import date, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from credit.models import CreditScoreSnapshot, Customer
+from credit.services.analytics import CUSTOMER_COLUMNS, iter_frames
+from credit.services.credit_profile import aggregate_credit_profiles
+from credit.services.policy import get_policy
+
+logger = logging.getLogger(__name__)
+
+PROFILE_COLUMNS = {
+    "active_debt": "active_principal",
+    "active_emi_total": "active_emi",
+    "loan_count": "loan_count",
+    "on_time_emis": "on_time_emis",
+}
+
+
+def latest_snapshot_date(before=None):
+    snapshots = CreditScoreSnapshot.objects.all()
+    if before is not None:
+        snapshots = snapshots.filter(snapshot_date__lt=before)
+    return snapshots.aggregate(latest=Max("snapshot_date"))["latest"]
+
+
+def latest_scores(snapshot_date=None):
+    """Snapshot rows of the most recent (or given) date; order_by("-score") to rank."""
+    snapshot_date = snapshot_date or latest_snapshot_date()
+    return CreditScoreSnapshot.objects.filter(snapshot_date=snapshot_date)
+
+
+# ========================
+# Vectorized scoring
+# ========================
+def score_frame(frame, policy, year):
+    """
+    Scores for a DataFrame of Customer.id + analytics.CUSTOMER_COLUMNS rows,
+    with the same rules as calculate_credit_score. Customers without a
+    summary row are aggregated from their loans in one grouped query.
+    """
+    frame = frame.rename(columns=lambda c: c.replace("credit_summary__", ""))
+    frame["this_year"] = frame["loans_per_year"].map(
+        lambda counts: (counts or {}).get(year, 0)
+    )
+
+    missing = frame["loan_count"].isna()
+    if missing.any():
+        profiles = aggregate_credit_profiles(frame.loc[missing, "id"].tolist())
+        for column, key in {**PROFILE_COLUMNS, "this_year": "current_year_loans"}.items():
+            frame.loc[missing, column] = frame.loc[missing, "id"].map(
+                lambda pk: profiles[pk][key]
+            )
+
+    def column(name):
+        return frame[name].to_numpy(dtype=np.float64)
+
+    score = policy.credit_score_arrays(
+        column("approved_limit"),
+        column("monthly_salary"),
+        column("active_debt"),
+        column("active_emi_total"),
+        column("loan_count"),
+        column("on_time_emis"),
+        column("this_year"),
+    )
+    return frame["id"].tolist(), score, policy.slab_labels(score)
+
+
+# ========================
+# Snapshot job
+# ========================
+def snapshot_scores(snapshot_date=None, full=False, batch_size=None):
+    """
+    Write the CreditScoreSnapshot rows for snapshot_date (today).
+
+    Incremental by default: only customers created, or whose summary was
+    updated (loan or salary/limit changes), since the previous run are
+    rescored; everyone else is carried forward from the previous snapshot
+    date with one INSERT ... SELECT. A full rescore runs when there is no
+    previous snapshot, the policy version changed or a new year started
+    (current-year loan counts reset). Returns a summary dict.
+    """
+    snapshot_date = snapshot_date or date.today()
+    batch_size = batch_size or getattr(settings, "CREDIT_SCORE_SNAPSHOT_BATCH_SIZE", 20000)
+    policy = get_policy()
+    run_started = timezone.now()
+
+    previous_date = latest_snapshot_date(before=snapshot_date)
+    today_exists = CreditScoreSnapshot.objects.filter(snapshot_date=snapshot_date).exists()
+    reference_date = snapshot_date if today_exists else previous_date
+
+    since = None
+    if not full and reference_date is not None:
+        reference = CreditScoreSnapshot.objects.filter(snapshot_date=reference_date)
+        stale_policy = reference.exclude(policy_version=policy.version).exists()
+        if not stale_policy and reference_date.year == snapshot_date.year:
+            since = reference.aggregate(last=Max("computed_at"))["last"]
+
+    customers = Customer.objects.order_by("pk")
+    if since is not None:
+        # Every customer has a summary row (created empty with the customer)
+        customers = customers.filter(
+            Q(created_at__gt=since) | Q(credit_summary__updated_at__gt=since)
+        )
+
+    rescored = 0
+    year = str(snapshot_date.year)
+    for frame in iter_frames(customers, ("id", *CUSTOMER_COLUMNS), batch_size):
+        ids, score, slabs = score_frame(frame, policy, year)
+        CreditScoreSnapshot.objects.bulk_create(
+            [
+                CreditScoreSnapshot(
+                    customer_id=pk,
+                    snapshot_date=snapshot_date,
+                    score=round(float(value), 2),
+                    slab=str(slab),
+                    policy_version=policy.version,
+                    computed_at=run_started,
+                )
+                for pk, value, slab in zip(ids, score, slabs)
+            ],
+            batch_size=5000,
+            update_conflicts=True,
+            unique_fields=["customer", "snapshot_date"],
+            update_fields=["score", "slab", "policy_version", "computed_at"],
+        )
+        rescored += len(ids)
+
+    carried = 0
+    if since is not None and not today_exists:
+        carried = carry_forward(previous_date, snapshot_date)
+
+    pruned = prune_snapshots(snapshot_date)
+    result = {
+        "snapshot_date": snapshot_date.isoformat(),
+        "mode": "incremental" if since is not None else "full",
+        "rescored": rescored,
+        "carried_forward": carried,
+        "pruned": pruned,
+        "policy_version": policy.version,
+    }
+    logger.info("Credit score snapshot: %s", result)
+    return result
+
+
+def carry_forward(from_date, to_date):
+    """Copy every from_date score missing on to_date. Returns rows copied."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO credit_creditscoresnapshot
+                (customer_id, snapshot_date, score, slab, policy_version, computed_at)
+            SELECT customer_id, %s, score, slab, policy_version, computed_at
+            FROM credit_creditscoresnapshot
+            WHERE snapshot_date = %s
+            ON CONFLICT (customer_id, snapshot_date) DO NOTHING
+            """,
+            [to_date, from_date],
+        )
+        return cursor.rowcount
+
+
+def prune_snapshots(snapshot_date):
+    """Delete snapshot dates older than CREDIT_SCORE_SNAPSHOT_RETENTION_DAYS."""
+    days = getattr(settings, "CREDIT_SCORE_SNAPSHOT_RETENTION_DAYS", 90)
+    if not days:
+        return 0
+    deleted, _ = CreditScoreSnapshot.objects.filter(
+        snapshot_date__lt=snapshot_date - timedelta(days=days)
+    ).delete()
+    return deleted
@@ -0,0 +1,167 @@
+# credit/services/sources.py
+import csv
+import os
+from pathlib import Path
+
+import pandas as pd
+
+EXCEL_SUFFIXES = (".xlsx", ".xlsm")
+
+
+def read_source(path):
+    """Read a whole customer/loan source file into one DataFrame."""
+    suffix = Path(path).suffix.lower()
+    if suffix in EXCEL_SUFFIXES:
+        return pd.read_excel(path)
+    if suffix == ".csv":
+        return pd.read_csv(path)
+    if suffix == ".parquet":
+        return pd.read_parquet(path)
+    raise ValueError(f"Unsupported source file type: {path}")
+
+
+def iter_source_batches(path, batch_size):
+    """
+    Yield DataFrames of at most batch_size rows without materializing the
+    whole file: openpyxl read-only row iteration for Excel, chunked
+    read_csv for CSV and row-group batches for Parquet.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in EXCEL_SUFFIXES:
+        yield from _iter_excel(path, batch_size)
+    elif suffix == ".csv":
+        yield from pd.read_csv(path, chunksize=batch_size)
+    elif suffix == ".parquet":
+        yield from _iter_parquet(path, batch_size)
+    else:
+        raise ValueError(f"Unsupported source file type: {path}")
+
+
+def count_source_rows(path):
+    """Number of data rows (excluding the header) in a source file."""
+    suffix = Path(path).suffix.lower()
+    if suffix in EXCEL_SUFFIXES:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            sheet = workbook.active
+            if sheet.max_row is None:
+                # No dimension record in the file: count the rows themselves
+                return sum(1 for _ in sheet.iter_rows(min_row=2, values_only=True))
+            return max(sheet.max_row - 1, 0)
+        finally:
+            workbook.close()
+    if suffix == ".csv":
+        with open(path, "rb") as handle:
+            return max(sum(1 for _ in handle) - 1, 0)
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).metadata.num_rows
+    raise ValueError(f"Unsupported source file type: {path}")
+
+
+def stage_source(path, staging_dir, batch_size=10000):
+    """
+    Convert an Excel source to CSV once, so row-range shards can skip to
+    their offset without re-parsing the workbook up to it. Other formats
+    are returned as they are. The staged copy is keyed on the source's
+    mtime and size and reused until the source changes.
+    Returns the path shards should read.
+    """
+    source = Path(path)
+    if source.suffix.lower() not in EXCEL_SUFFIXES:
+        return str(source)
+
+    stat = source.stat()
+    staging_dir = Path(staging_dir)
+    staged = staging_dir / f"{source.stem}-{stat.st_mtime_ns}-{stat.st_size}.csv"
+    if staged.exists():
+        return str(staged)
+
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    partial = staged.with_suffix(".csv.partial")
+    with open(partial, "w", newline="") as handle:
+        writer = None
+        for batch in _iter_excel(path, batch_size):
+            if writer is None:
+                writer = csv.writer(handle)
+                writer.writerow(batch.columns)
+            writer.writerows(batch.itertuples(index=False, name=None))
+    os.replace(partial, staged)
+
+    # Drop copies staged from earlier versions of the same file
+    for old in staging_dir.glob(f"{source.stem}-*.csv"):
+        if old != staged:
+            old.unlink(missing_ok=True)
+    return str(staged)
+
+
+def read_source_range(path, start, stop):
+    """Read data rows [start, stop) of a source file into one DataFrame."""
+    suffix = Path(path).suffix.lower()
+    if suffix in EXCEL_SUFFIXES:
+        return _read_excel_range(path, start, stop)
+    if suffix == ".csv":
+        return pd.read_csv(path, skiprows=range(1, start + 1), nrows=stop - start)
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).read().slice(start, stop - start).to_pandas()
+    raise ValueError(f"Unsupported source file type: {path}")
+
+
+def _read_excel_range(path, start, stop):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        header = next(sheet.iter_rows(max_row=1, values_only=True), None)
+        if header is None:
+            return pd.DataFrame()
+        columns = ["" if c is None else str(c) for c in header]
+
+        # Row 1 is the header, data row i lives on sheet row i + 2
+        rows = [
+            row[:len(columns)]
+            for row in sheet.iter_rows(min_row=start + 2, max_row=stop + 1, values_only=True)
+            if not all(value is None for value in row)
+        ]
+        return pd.DataFrame(rows, columns=columns)
+    finally:
+        workbook.close()
+
+
+def _iter_excel(path, batch_size):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = ["" if c is None else str(c) for c in header]
+
+        batch = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            batch.append(row[:len(columns)])
+            if len(batch) >= batch_size:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def _iter_parquet(path, batch_size):
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+        yield record_batch.to_pandas()
@@ -0,0 +1,29 @@
+# credit/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CreditPolicy, Customer, Loan
+from .services.credit_summary import ensure_summaries, touch_summaries
+from .services.policy import expire_policy
+from .services.score_cache import credit_cache
+
+
+@receiver([post_save, post_delete], sender=Loan)
+def invalidate_loan_customer_score(sender, instance, **kwargs):
+    credit_cache.invalidate_on_commit([instance.customer_id])
+
+
+@receiver([post_save, post_delete], sender=Customer)
+def invalidate_customer_score(sender, instance, **kwargs):
+    # approved_limit / monthly_salary feed the score as well
+    credit_cache.invalidate_on_commit([instance.pk])
+    if kwargs.get("signal") is post_save:
+        if kwargs.get("created"):
+            ensure_summaries([instance.pk])
+        else:
+            touch_summaries([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=CreditPolicy)
+def reload_credit_policy(sender, instance, **kwargs):
+    expire_policy()
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'customers', views.CustomerViewSet, basename='customer')
@@ -12,7 +12,20 @@ urlpatterns = [
     # API endpoints
     path('register/', views.register_customer, name='register_customer'),
     path('check-eligibility/', views.check_eligibility, name='check_eligibility'),
+    path('check-eligibility/batch/', views.check_eligibility_bulk, name='check_eligibility_bulk'),
     path('create-loan/', views.create_loan, name='create_loan'),
+    path('amortization-schedule/', views.loan_schedule, name='loan_schedule'),
+    path('cache-stats/', views.cache_stats, name='cache_stats'),
+    path('ready/', views.readiness_check, name='readiness_check'),
+    path('analytics/', views.portfolio_analytics, name='portfolio_analytics'),
+    path('analytics/<str:metric>/', views.portfolio_analytics, name='portfolio_analytics_metric'),
+    path('export/loans/', views.export_loans, name='export_loans'),
+    path('export/customers/', views.export_customers, name='export_customers'),
     path('loan/<int:loan_id>/', views.view_loan, name='view_loan'),
     path('customer/<int:customer_id>/loans/', views.view_loans_by_customer, name='view_loans_by_customer'),
+
+    # Async variants, served through asgi.py
+    path('async/check-eligibility/', async_views.check_eligibility, name='async_check_eligibility'),
+    path('async/loan/<int:loan_id>/', async_views.view_loan, name='async_view_loan'),
+    path('async/customer/<int:customer_id>/loans/', async_views.view_loans_by_customer, name='async_view_loans_by_customer'),
 ]
\ No newline at end of file
@@ -1,12 +1,36 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from django.db.models import Sum, F
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum, F, Q
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
 from django.shortcuts import render, get_object_or_404
 from datetime import date, timedelta
 
-from .models import Customer, Loan
-from .serializers import CustomerSerializer, LoanSerializer
+from .db_router import ReplicaReadMixin, pin_to_primary, replica_reads
+from .models import Customer, Loan, LoanArchive
+from .pagination import LoanCursorPagination
+from .serializers import CustomerSerializer, FlatLoanSerializer, LoanSerializer
+from .services import analytics
+from .services.batch_eligibility import check_eligibility_batch
+from .services.bootstrap import readiness
+from .services.credit_profile import get_credit_profile
+from .services.credit_summary import loan_state, record_loan_change
+from .services.emi import MAX_TENURE_MONTHS, amortization_schedule, calculate_emi
+from .services.export import EXPORT_FORMATS, stream_export
+from .services.idempotency import (
+    MAX_KEY_LENGTH,
+    IdempotencyConflict,
+    find_replay,
+    request_fingerprint,
+    store_response,
+)
+from .services.metrics import registry as metrics_registry, timed
+from .services.policy import get_policy
+from .services.score_cache import credit_cache
 
 # ==================================
 # Dashboard View
@@ -18,107 +42,49 @@ def dashboard(request):
 # ==================================
 # Helper Functions
 # ==================================
-def calculate_emi(principal, annual_rate, tenure_months):
-    r_month = annual_rate / 12 / 100
-    n = tenure_months
-
-    if r_month == 0:
-        return round(principal / n, 2)
-
-    emi = principal * r_month * (1 + r_month) ** n / ((1 + r_month) ** n - 1)
-    return round(emi, 2)
-
-
-def calculate_credit_score(customer):
-    loans = customer.loans.all()
-    score = 50
-
-    total_current_loans = loans.filter(is_active=True).aggregate(
-        total=Sum("loan_amount")
-    )["total"] or 0
-
-    if total_current_loans > customer.approved_limit:
-        return 0
-
-    on_time_ratio = sum(l.emis_paid_on_time for l in loans) / max(len(loans), 1)
-    score += on_time_ratio * 50
-
-    score -= len(loans) * 5
-
-    score -= sum(
-        1 for l in loans
-        if l.start_date and l.start_date.year == date.today().year
-    ) * 5
-
-    total_emi = loans.filter(is_active=True).aggregate(
-        total=Sum("monthly_repayment")
-    )["total"] or 0
-
-    if total_emi > 0.5 * customer.monthly_salary:
-        score = min(score, 10)
-
-    return max(0, min(100, score))
-
-
-def check_eligibility_logic(customer, loan_amount, interest_rate, tenure):
-    loans = customer.loans.all()
-
-    # Rule 1: If total current loans > approved_limit → reject
-    total_current_loans = loans.filter(is_active=True).aggregate(
-        total=Sum("loan_amount")
-    )["total"] or 0
-    if total_current_loans > customer.approved_limit:
-        return False, interest_rate, 0
-
-    # Rule 2: If total EMI > 50% salary → reject
-    total_emi = loans.filter(is_active=True).aggregate(
-        total=Sum("monthly_repayment")
-    )["total"] or 0
-    if total_emi > 0.5 * customer.monthly_salary:
-        return False, interest_rate, 0
-
-    # ---- Credit Score Calculation ----
-    score = 50
-    if loans.exists():
-        on_time_ratio = sum(l.emis_paid_on_time for l in loans) / len(loans)
-        score += on_time_ratio * 50
-    score -= loans.count() * 5
-    score -= sum(
-        1 for l in loans if l.start_date.year == date.today().year
-    ) * 5
-    score = max(0, min(100, score))
-
-    # ---- Approval Slabs ----
-    corrected_rate = interest_rate
-    approved = False
-    if score > 50:
-        approved = True
-    elif 50 >= score > 30:
-        corrected_rate = max(interest_rate, 12)
-        approved = True
-    elif 30 >= score > 10:
-        corrected_rate = max(interest_rate, 16)
-        approved = True
-    else:
-        approved = False
-
-    if not approved:
-        return False, round(corrected_rate, 2), 0
-
-    monthly_installment = calculate_emi(
-        loan_amount,
-        corrected_rate,
-        tenure
-    )
-    return True, round(corrected_rate, 2), monthly_installment
+def get_scoring_inputs(customer):
+    """
+    Cached {"profile": ..., "score": ...} for a customer, computed and
+    stored on a miss. Invalidated whenever the customer's loans change.
+    """
+    entry = credit_cache.get(customer.pk)
+    if entry is None:
+        profile = get_credit_profile(customer)
+        entry = credit_cache.set(customer.pk, profile, calculate_credit_score(customer, profile))
+    return entry
+
+
+def calculate_credit_score(customer, profile=None):
+    if profile is None:
+        return get_scoring_inputs(customer)["score"]
+    return get_policy().credit_score(customer, profile)
+
+
+@timed("eligibility")
+def check_eligibility_logic(customer, loan_amount, interest_rate, tenure, profile=None):
+    """
+    (approved, corrected_rate, monthly_installment) under the active credit
+    policy: debt-limit and EMI-cap rejections, score slabs and floor rates.
+    """
+    if profile is None:
+        profile = get_scoring_inputs(customer)["profile"]
+    return get_policy().evaluate(customer, profile, loan_amount, interest_rate, tenure)
+
+
+# Shared by the listing actions and the export endpoint
+LOAN_STATUS_FILTERS = {
+    "late": Q(emis_paid_on_time__lt=F("tenure")),
+    "active": Q(is_active=True),
+}
 
 
 # ==================================
 # Customer ViewSet
 # ==================================
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
+    replica_actions = ("list",)
 
     @action(detail=True, methods=["get"])
     def total_debt(self, request, pk=None):
@@ -135,21 +101,59 @@ class CustomerViewSet(viewsets.ModelViewSet):
 # ==================================
 # Loan ViewSet
 # ==================================
-class LoanViewSet(viewsets.ModelViewSet):
-    queryset = Loan.objects.all()
+class LoanViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = Loan.objects.select_related("customer")
     serializer_class = LoanSerializer
+    pagination_class = LoanCursorPagination
+    replica_actions = ("late_loans", "active_loans")
+
+    def list(self, request, *args, **kwargs):
+        return self.paginated_listing(self.filter_queryset(self.get_queryset()))
+
+    def paginated_listing(self, queryset):
+        """
+        Cursor-paginated listing. ?fields=a,b,c switches to the flat
+        serializer, which reads only those columns.
+        """
+        fields = self.request.query_params.get("fields")
+        if fields:
+            try:
+                flat = FlatLoanSerializer(fields.split(","))
+            except ValidationError as e:
+                return Response({"error": e.detail}, status=400)
+            page = self.paginate_queryset(flat.prepare(queryset))
+            return self.get_paginated_response(flat.to_representation(page))
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            loan = serializer.save()
+            record_loan_change(after=loan_state(loan))
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            before = loan_state(serializer.instance)
+            loan = serializer.save()
+            record_loan_change(before=before, after=loan_state(loan))
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            before = loan_state(instance)
+            instance.delete()
+            record_loan_change(before=before)
 
     @action(detail=False, methods=["get"])
     def late_loans(self, request):
-        late = Loan.objects.filter(emis_paid_on_time__lt=F("tenure"))
-        serializer = self.get_serializer(late, many=True)
-        return Response(serializer.data)
+        late = self.get_queryset().filter(LOAN_STATUS_FILTERS["late"])
+        return self.paginated_listing(late)
 
     @action(detail=False, methods=["get"])
     def active_loans(self, request):
-        active = Loan.objects.filter(is_active=True)
-        serializer = self.get_serializer(active, many=True)
-        return Response(serializer.data)
+        active = self.get_queryset().filter(LOAN_STATUS_FILTERS["active"])
+        return self.paginated_listing(active)
 
 
 # ==================================
@@ -171,6 +175,7 @@ def register_customer(request):
             approved_limit=approved_limit,
             current_debt=0
         )
+        pin_to_primary(customer=customer.customer_id)
 
         # Custom response per documentation
         response_data = {
@@ -226,6 +231,116 @@ def check_eligibility(request):
         return Response({"error": str(e)}, status=400)
 
 
+@api_view(["POST"])
+def check_eligibility_bulk(request):
+    data = request.data
+    items = data.get("requests") if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return Response({"error": "A non-empty list of requests is required"}, status=400)
+
+    max_requests = getattr(settings, "CREDIT_BATCH_ELIGIBILITY_MAX", 50000)
+    if len(items) > max_requests:
+        return Response({"error": f"At most {max_requests} requests per call"}, status=400)
+
+    parsed = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            return Response({"error": f"Request {index} must be an object"}, status=400)
+        fields = [item.get(k) for k in ("customer_id", "loan_amount", "interest_rate", "tenure")]
+        if not all(fields):
+            return Response({"error": f"Request {index}: all fields are required"}, status=400)
+        try:
+            parsed.append((int(fields[0]), float(fields[1]), float(fields[2]), int(fields[3])))
+        except (TypeError, ValueError):
+            return Response({"error": f"Request {index}: invalid data type"}, status=400)
+
+    return Response({"results": check_eligibility_batch(parsed)})
+
+
+@api_view(["POST"])
+def loan_schedule(request):
+    data = request.data
+    if not isinstance(data, dict):
+        return Response({"error": "Request body must be a JSON object"}, status=400)
+    loan_id = data.get("loan_id")
+
+    if loan_id:
+        try:
+            loan_id = int(loan_id)
+        except (TypeError, ValueError):
+            return Response({"error": "loan_id must be an integer"}, status=400)
+        loan = get_object_or_404(Loan, loan_id=loan_id)
+        loan_amount, interest_rate, tenure = loan.loan_amount, loan.interest_rate, loan.tenure
+    else:
+        loan_amount = data.get("loan_amount")
+        interest_rate = data.get("interest_rate")
+        tenure = data.get("tenure")
+        if loan_amount is None or interest_rate is None or tenure is None:
+            return Response({"error": "loan_id or loan_amount, interest_rate and tenure are required"}, status=400)
+        try:
+            loan_amount = float(loan_amount)
+            interest_rate = float(interest_rate)
+            tenure = int(tenure)
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid data type"}, status=400)
+        if not 0 < tenure <= MAX_TENURE_MONTHS:
+            return Response({"error": f"tenure must be between 1 and {MAX_TENURE_MONTHS} months"}, status=400)
+        if interest_rate < 0:
+            return Response({"error": "interest_rate must not be negative"}, status=400)
+
+    schedule = amortization_schedule(loan_amount, interest_rate, tenure)
+    return Response({
+        "loan_id": loan_id,
+        "loan_amount": loan_amount,
+        "interest_rate": interest_rate,
+        "tenure": tenure,
+        "monthly_installment": calculate_emi(loan_amount, interest_rate, tenure),
+        "total_interest": round(sum(row["interest"] for row in schedule), 2),
+        "schedule": schedule
+    })
+
+
+@api_view(["GET"])
+def cache_stats(request):
+    return Response(credit_cache.snapshot())
+
+
+@api_view(["GET"])
+def portfolio_analytics(request, metric=None):
+    """
+    Precomputed portfolio metrics (all, or one of analytics.METRICS).
+    Served from the snapshot written by the refresh task; never computed
+    on request.
+    """
+    metrics = [metric] if metric else list(analytics.METRICS)
+    if metric and metric not in analytics.METRICS:
+        return Response(
+            {"error": f"Unknown metric. Available: {', '.join(analytics.METRICS)}"}, status=404
+        )
+
+    results = {name: analytics.get_analytics(name) for name in metrics}
+    missing = [name for name, result in results.items() if result is None]
+    if missing:
+        return Response(
+            {"error": "Analytics not computed yet", "missing": missing},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    return Response(results[metric] if metric else results)
+
+
+@require_GET
+def readiness_check(request):
+    """200 once the initial data load has completed, 503 before."""
+    ready, details = readiness()
+    return JsonResponse({"ready": ready, **details}, status=200 if ready else 503)
+
+
+@require_GET
+def metrics(request):
+    """Prometheus text exposition of this process's request metrics."""
+    return HttpResponse(metrics_registry.render(), content_type="text/plain; version=0.0.4")
+
+
 @api_view(["POST"])
 def create_loan(request):
     data = request.data
@@ -245,52 +360,82 @@ def create_loan(request):
     except ValueError:
         return Response({"error": "Invalid data type"}, status=400)
 
-    customer = get_object_or_404(Customer, customer_id=customer_id)
-    approved, corrected_rate, monthly_installment = check_eligibility_logic(
-        customer, loan_amount, interest_rate, tenure
-    )
-
-    if not approved:
-        return Response({
-            "loan_approved": False,
-            "message": "Loan not approved due to credit score or limits"
-        }, status=400)
-
-    last_loan = Loan.objects.order_by("-loan_id").first()
-    loan_id = (last_loan.loan_id + 1) if last_loan else 1
-
-    loan = Loan.objects.create(
-        loan_id=loan_id,
-        customer=customer,
-        loan_amount=loan_amount,
-        tenure=tenure,
-        interest_rate=round(corrected_rate, 2),
-        monthly_repayment=round(monthly_installment, 2),
-        emis_paid_on_time=0,
-        is_active=True,
-        start_date=date.today(),
-        end_date=date.today() + timedelta(days=30 * tenure)
-    )
-
-    customer.current_debt += loan_amount
-    customer.save(update_fields=["current_debt"])
+    idempotency_key = request.headers.get("Idempotency-Key")
+    if idempotency_key and len(idempotency_key) > MAX_KEY_LENGTH:
+        return Response({"error": f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"}, status=400)
+    fingerprint = request_fingerprint([customer_id, loan_amount, interest_rate, tenure])
 
-    return Response({
-        "loan_id": loan.loan_id,
-        "customer_id": customer.customer_id,
-        "loan_approved": True,
-        "loan_amount": loan.loan_amount,
-        "tenure": loan.tenure,
-        "interest_rate": loan.interest_rate,
-        "monthly_installment": loan.monthly_repayment,
-        "start_date": loan.start_date,
-        "end_date": loan.end_date
-    })
+    try:
+        with transaction.atomic():
+            # Serializes concurrent bookings for the same customer
+            customer = get_object_or_404(
+                Customer.objects.select_for_update(), customer_id=customer_id
+            )
+
+            if idempotency_key:
+                replay = find_replay(idempotency_key, fingerprint)
+                if replay is not None:
+                    status_code, body = replay
+                    return Response(body, status=status_code)
+
+            # Fresh aggregates under the lock, not the score cache
+            approved, corrected_rate, monthly_installment = check_eligibility_logic(
+                customer, loan_amount, interest_rate, tenure,
+                profile=get_credit_profile(customer)
+            )
+
+            if not approved:
+                status_code, body = 400, {
+                    "loan_approved": False,
+                    "message": "Loan not approved due to credit score or limits"
+                }
+            else:
+                loan = Loan.objects.create(
+                    customer=customer,
+                    loan_amount=loan_amount,
+                    tenure=tenure,
+                    interest_rate=round(corrected_rate, 2),
+                    monthly_repayment=round(monthly_installment, 2),
+                    emis_paid_on_time=0,
+                    is_active=True,
+                    start_date=date.today(),
+                    end_date=date.today() + timedelta(days=30 * tenure)
+                )
+                record_loan_change(after=loan_state(loan))
+                pin_to_primary(customer=customer.customer_id, loan=loan.loan_id)
+
+                Customer.objects.filter(pk=customer.pk).update(
+                    current_debt=F("current_debt") + int(loan_amount)
+                )
+
+                status_code, body = 200, {
+                    "loan_id": loan.loan_id,
+                    "customer_id": customer.customer_id,
+                    "loan_approved": True,
+                    "loan_amount": loan.loan_amount,
+                    "tenure": loan.tenure,
+                    "interest_rate": loan.interest_rate,
+                    "monthly_installment": loan.monthly_repayment,
+                    "start_date": loan.start_date,
+                    "end_date": loan.end_date
+                }
+
+            if idempotency_key:
+                body = store_response(idempotency_key, fingerprint, status_code, body)
+
+    except IdempotencyConflict:
+        return Response({"error": "Idempotency-Key was already used for a different request"}, status=409)
+
+    return Response(body, status=status_code)
 
 
 @api_view(["GET"])
+@replica_reads(pins=lambda request, loan_id: {"loan": loan_id})
 def view_loan(request, loan_id):
-    loan = get_object_or_404(Loan, loan_id=loan_id)
+    loan = (
+        Loan.objects.select_related("customer").filter(loan_id=loan_id).first()
+        or get_object_or_404(LoanArchive.objects.select_related("customer"), loan_id=loan_id)
+    )
     return Response({
         "loan_id": loan.loan_id,
         "customer": {
@@ -308,10 +453,12 @@ def view_loan(request, loan_id):
 
 
 @api_view(["GET"])
+@replica_reads(pins=lambda request, customer_id: {"customer": customer_id})
 def view_loans_by_customer(request, customer_id):
     customer = get_object_or_404(Customer, customer_id=customer_id)
-    loans = customer.loans.all()
-    total_debt = loans.filter(is_active=True).aggregate(total=Sum("loan_amount"))["total"] or 0
+    total_debt = customer.loans.filter(is_active=True).aggregate(total=Sum("loan_amount"))["total"] or 0
+    # Full history: archived (closed) loans are listed after the live ones
+    loans = [*customer.loans.all(), *customer.archived_loans.order_by("loan_id")]
 
     result = [
         {
@@ -326,4 +473,64 @@ def view_loans_by_customer(request, customer_id):
             "is_active": l.is_active
         } for l in loans
     ]
-    return Response({"total_debt": total_debt, "loans": result})
\ No newline at end of file
+    return Response({"total_debt": total_debt, "loans": result})
+
+
+# ==================================
+# Streaming Exports
+# ==================================
+LOAN_EXPORT_COLUMNS = {
+    "loan_id": "loan_id",
+    "customer_id": "customer__customer_id",
+    "loan_amount": "loan_amount",
+    "tenure": "tenure",
+    "interest_rate": "interest_rate",
+    "monthly_repayment": "monthly_repayment",
+    "emis_paid_on_time": "emis_paid_on_time",
+    "start_date": "start_date",
+    "end_date": "end_date",
+    "is_active": "is_active",
+}
+
+CUSTOMER_EXPORT_COLUMNS = {
+    "customer_id": "customer_id",
+    "first_name": "first_name",
+    "last_name": "last_name",
+    "age": "age",
+    "phone_number": "phone_number",
+    "monthly_salary": "monthly_salary",
+    "approved_limit": "approved_limit",
+    "current_debt": "current_debt",
+}
+
+
+def _export_response(queryset, columns, request, name):
+    fmt = request.GET.get("format", "ndjson")
+    if fmt not in EXPORT_FORMATS:
+        return JsonResponse({"error": f"format must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+
+    response = StreamingHttpResponse(
+        stream_export(queryset, columns, fmt),
+        content_type=EXPORT_FORMATS[fmt],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{name}.{fmt}"'
+    return response
+
+
+@require_GET
+def export_loans(request):
+    """?status=active|late applies the same filter as the listing actions."""
+    loans = Loan.objects.order_by("loan_id")
+    status_filter = request.GET.get("status")
+    if status_filter:
+        if status_filter not in LOAN_STATUS_FILTERS:
+            return JsonResponse({"error": f"status must be one of {', '.join(LOAN_STATUS_FILTERS)}"}, status=400)
+        loans = loans.filter(LOAN_STATUS_FILTERS[status_filter])
+
+    return _export_response(loans, LOAN_EXPORT_COLUMNS, request, f"loans_{status_filter or 'all'}")
+
+
+@require_GET
+def export_customers(request):
+    customers = Customer.objects.order_by("customer_id")
+    return _export_response(customers, CUSTOMER_EXPORT_COLUMNS, request, "customers")
@@ -1,14 +1,19 @@
 import os
 import django
 import logging
-from celery import Celery
+from collections import Counter
+from celery import Celery, chord
 from celery.schedules import crontab
+from celery.signals import task_postrun, task_prerun
 from django.conf import settings
+from django.db import close_old_connections
 
 # ========================
 # Set up Django environment
 # ========================
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+# Selects the worker-side DB_CONN_MAX_AGE / DB_POOL_* sizing in settings.py
+os.environ.setdefault("CREDIT_PROCESS_ROLE", "worker")
 django.setup()
 
 # ========================
@@ -28,50 +33,78 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 # Auto-discover tasks from installed apps
 app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
 
+# ========================
+# DB connection hygiene
+# ========================
+# Tasks get no request_started/finished signals, so persistent connections
+# past CONN_MAX_AGE or broken by the server are only recycled here
+@task_prerun.connect
+def _close_stale_connections_before_task(**kwargs):
+    close_old_connections()
+
+
+@task_postrun.connect
+def _close_stale_connections_after_task(**kwargs):
+    close_old_connections()
+
+
 # ========================
 # Celery Beat schedule
 # ========================
 app.conf.beat_schedule = {
     "ingest_customer_loan_data": {
-        "task": "credit_celery.ingest_excel_data",
+        "task": (
+            "credit_celery.ingest_excel_data_sharded"
+            if settings.CREDIT_INGEST_SHARDED
+            else "credit_celery.ingest_excel_data"
+        ),
         "schedule": crontab(hour=0, minute=0),  # daily at midnight
         "args": (),
     },
+    "archive_closed_loans": {
+        "task": "credit_celery.archive_closed_loans",
+        "schedule": crontab(hour=2, minute=0),  # daily, after ingestion
+        "args": (),
+    },
+    "snapshot_credit_scores": {
+        "task": "credit_celery.snapshot_credit_scores",
+        "schedule": crontab(minute=30),  # hourly; only changed customers are rescored
+        "args": (),
+    },
+    "prune_idempotency_keys": {
+        "task": "credit_celery.prune_idempotency_keys",
+        "schedule": crontab(hour=3, minute=0),  # daily
+        "args": (),
+    },
+    "refresh_portfolio_analytics": {
+        "task": "credit_celery.refresh_portfolio_analytics",
+        "schedule": crontab(minute="*/15"),  # skipped when the book is unchanged
+        "args": (),
+    },
 }
 
 # ========================
 # Celery Task: ingest_excel_data
 # ========================
 @app.task(bind=True, name="credit_celery.ingest_excel_data")
-def ingest_excel_data(self):
+def ingest_excel_data(self, batch_size=None, streaming=None, delta=None):
     """
     Load customer_data.xlsx and loan_data.xlsx into the database.
     Can be triggered manually or via Celery Beat.
+    Rows are upserted in batches of batch_size (CREDIT_INGEST_BATCH_SIZE by default);
+    streaming=True reads the files batch by batch instead of all at once;
+    delta=False forces a full re-upsert of files and rows seen before.
     """
-    import pandas as pd
-    from credit.models import Customer, Loan
+    from credit.services.ingestion import ingest_source
+    from credit.services.id_allocator import sync_id_sequences
 
     # ------------------
     # Customer Data
     # ------------------
     try:
         customer_file = os.path.join(settings.BASE_DIR, "static", "customer_data.xlsx")
-        df_cust = pd.read_excel(customer_file)
-
-        for _, row in df_cust.iterrows():
-            Customer.objects.update_or_create(
-                customer_id=int(row["customer_id"]),
-                defaults={
-                    "first_name": row["first_name"],
-                    "last_name": row["last_name"],
-                    "age": int(row.get("age", 30)),
-                    "phone_number": str(row["phone_number"]),
-                    "monthly_salary": float(row["monthly_salary"]),
-                    "approved_limit": float(row["approved_limit"]),
-                    "current_debt": float(row.get("current_debt", 0)),
-                },
-            )
-        logger.info("✅ Customer data ingested successfully.")
+        stats = ingest_source(customer_file, "customers", batch_size, streaming, delta)
+        logger.info(f"✅ Customer data ingested successfully: {stats}")
 
     except FileNotFoundError:
         logger.error("Customer Excel file not found.")
@@ -83,35 +116,235 @@ def ingest_excel_data(self):
     # ------------------
     try:
         loan_file = os.path.join(settings.BASE_DIR, "static", "loan_data.xlsx")
-        df_loan = pd.read_excel(loan_file)
-
-        for _, row in df_loan.iterrows():
-            try:
-                customer = Customer.objects.get(customer_id=int(row["customer_id"]))
-                Loan.objects.update_or_create(
-                    loan_id=int(row["loan_id"]),
-                    defaults={
-                        "customer": customer,
-                        "loan_amount": float(row["loan_amount"]),
-                        "tenure": int(row["tenure"]),
-                        "interest_rate": float(row["interest_rate"]),
-                        "monthly_repayment": float(row["monthly_repayment"]),
-                        "emis_paid_on_time": int(row.get("EMIs_paid_on_time", 0)),
-                        "start_date": pd.to_datetime(row["start_date"]).date()
-                        if pd.notna(row["start_date"])
-                        else None,
-                        "end_date": pd.to_datetime(row["end_date"]).date()
-                        if pd.notna(row["end_date"])
-                        else None,
-                        "is_active": bool(row.get("is_active", 1)),
-                    },
-                )
-            except Customer.DoesNotExist:
-                logger.warning(f"Customer ID {row['customer_id']} not found. Skipping loan {row['loan_id']}.")
-
-        logger.info("✅ Loan data ingested successfully.")
+        stats = ingest_source(loan_file, "loans", batch_size, streaming, delta)
+        logger.info(f"✅ Loan data ingested successfully: {stats}")
 
     except FileNotFoundError:
         logger.error("Loan Excel file not found.")
     except Exception as e:
-        logger.error(f"Error ingesting loan data: {e}", exc_info=True)
\ No newline at end of file
+        logger.error(f"Error ingesting loan data: {e}", exc_info=True)
+
+    sync_id_sequences()
+
+
+# ========================
+# Celery Tasks: sharded ingestion
+# ========================
+def _source_files():
+    return {
+        "customers": os.path.join(settings.BASE_DIR, "static", "customer_data.xlsx"),
+        "loans": os.path.join(settings.BASE_DIR, "static", "loan_data.xlsx"),
+    }
+
+
+def _plan_shards(kind, shard_size, batch_size, delta):
+    """
+    Split one source file into row-range shard signatures.
+    Returns (signatures, file_sha256); no shards when delta mode
+    finds the file already ingested.
+    """
+    from credit.services.fingerprints import already_ingested, file_sha256
+    from credit.services.sources import count_source_rows, stage_source
+
+    path = _source_files()[kind]
+    if delta is None:
+        delta = settings.CREDIT_INGEST_DELTA
+
+    digest = file_sha256(path) if delta else None
+    if digest and already_ingested(kind, digest):
+        logger.info(f"{kind} file unchanged since last ingestion, skipping.")
+        return [], None
+
+    # Shards of a workbook would each re-parse every row before their offset
+    path = stage_source(path, settings.CREDIT_INGEST_STAGING_DIR)
+    total = count_source_rows(path)
+    signatures = [
+        ingest_shard.si(path, kind, start, min(start + shard_size, total), batch_size, delta)
+        for start in range(0, total, shard_size)
+    ]
+    return signatures, digest
+
+
+@app.task(bind=True, name="credit_celery.ingest_excel_data_sharded")
+def ingest_excel_data_sharded(self, shard_size=None, batch_size=None, delta=None):
+    """
+    Fan-out version of ingest_excel_data. Customer shards run as one chord;
+    its callback dispatches the loan shards as a second chord, so no loan
+    shard starts before every customer is written. finalize_sharded_ingestion
+    reconciles current_debt and reports totals.
+    """
+    shard_size = shard_size or settings.CREDIT_INGEST_SHARD_SIZE
+    customer_shards, customer_digest = _plan_shards("customers", shard_size, batch_size, delta)
+
+    next_step = dispatch_loan_shards.s(shard_size, batch_size, delta, customer_digest)
+    if customer_shards:
+        chord(customer_shards)(next_step)
+    else:
+        next_step.delay([])
+
+    return {"customer_shards": len(customer_shards)}
+
+
+@app.task(name="credit_celery.ingest_shard")
+def ingest_shard(path, kind, start, stop, batch_size=None, delta=None):
+    from credit.services.ingestion import ingest_source_range
+
+    return ingest_source_range(path, kind, start, stop, batch_size, delta)
+
+
+@app.task(name="credit_celery.dispatch_loan_shards")
+def dispatch_loan_shards(customer_results, shard_size, batch_size, delta, customer_digest):
+    loan_shards, loan_digest = _plan_shards("loans", shard_size, batch_size, delta)
+
+    finalize = finalize_sharded_ingestion.s(customer_results, customer_digest, loan_digest)
+    if loan_shards:
+        chord(loan_shards)(finalize)
+    else:
+        finalize.delay([])
+
+    return {"loan_shards": len(loan_shards)}
+
+
+@app.task(name="credit_celery.finalize_sharded_ingestion")
+def finalize_sharded_ingestion(loan_results, customer_results, customer_digest, loan_digest):
+    from credit.services.credit_summary import rebuild_summaries, reconcile_current_debt
+    from credit.services.fingerprints import record_file
+    from credit.services.id_allocator import sync_id_sequences
+
+    reconciled = reconcile_current_debt()
+
+    # Each shard rebuilt its customers' summaries in its own transaction;
+    # only customers touched by several shards can have raced
+    touched_by = Counter(
+        pk for result in loan_results for pk in result.get("touched_customers", ())
+    )
+    contended = sorted(pk for pk, shards in touched_by.items() if shards > 1)
+    rebuild_summaries(contended)
+    sync_id_sequences()
+
+    files = _source_files()
+    totals = {}
+    for kind, results, digest in (
+        ("customers", customer_results, customer_digest),
+        ("loans", loan_results, loan_digest),
+    ):
+        totals[kind] = {
+            "shards": len(results),
+            "rows": sum(r["rows"] for r in results),
+            "written": sum(r["written"] for r in results),
+            "skipped": sum(r["skipped"] for r in results),
+        }
+        if digest:
+            record_file(kind, digest, files[kind], totals[kind]["rows"])
+
+    totals["reconciled_customers"] = reconciled
+    totals["summaries_rebuilt"] = len(contended)
+    logger.info(f"✅ Sharded ingestion finished: {totals}")
+    return totals
+
+
+# ========================
+# Celery Task: archive_closed_loans
+# ========================
+@app.task(bind=True, name="credit_celery.archive_closed_loans")
+def archive_closed_loans(self, batch_size=None):
+    """
+    Move inactive loans past end_date + CREDIT_ARCHIVE_AFTER_DAYS into the
+    partitioned archive table, keeping the live loan table small.
+    """
+    from credit.services.archive import archive_closed_loans as archive
+
+    try:
+        archived = archive(batch_size=batch_size)
+    except Exception as e:
+        logger.error(f"Error archiving closed loans: {e}", exc_info=True)
+        return {"archived": 0}
+
+    logger.info(f"✅ Archived {archived} closed loans")
+    return {"archived": archived}
+
+
+# ========================
+# Celery Task: bootstrap_data
+# ========================
+@app.task(bind=True, name="credit_celery.bootstrap_data")
+def bootstrap_data(self, force=False):
+    """
+    One-shot initial data load (see manage.py bootstrap_data). Safe to
+    enqueue from several places: only the holder of the advisory lock
+    loads, and a load already at the current version is skipped.
+    """
+    from credit.services.bootstrap import BootstrapBusy, run_bootstrap
+
+    try:
+        result = run_bootstrap(force=force)
+    except BootstrapBusy:
+        logger.info("Initial data load already running elsewhere, skipping.")
+        return {"skipped": True, "busy": True}
+    except FileNotFoundError as e:
+        logger.error(f"Initial data file not found: {e.filename}")
+        return {"skipped": True, "error": str(e)}
+
+    logger.info(f"✅ Initial data bootstrap finished: {result}")
+    return result
+
+
+# ========================
+# Celery Task: refresh_portfolio_analytics
+# ========================
+@app.task(bind=True, name="credit_celery.refresh_portfolio_analytics")
+def refresh_portfolio_analytics(self, force=False):
+    """
+    Recompute the portfolio analytics snapshots served by /api/analytics/
+    when the loan book changed since the last run.
+    """
+    from credit.services.analytics import refresh_analytics
+
+    try:
+        refreshed = refresh_analytics(force=force)
+    except Exception as e:
+        logger.error(f"Error refreshing portfolio analytics: {e}", exc_info=True)
+        return {"refreshed": []}
+
+    if refreshed:
+        logger.info(f"✅ Portfolio analytics refreshed: {refreshed}")
+    return {"refreshed": refreshed}
+
+
+# ========================
+# Celery Task: snapshot_credit_scores
+# ========================
+@app.task(bind=True, name="credit_celery.snapshot_credit_scores")
+def snapshot_credit_scores(self, full=False, batch_size=None):
+    """
+    Rescore customers whose loans or income changed since the last run
+    (everyone with full=True) into today's CreditScoreSnapshot rows.
+    """
+    from credit.services.scores import snapshot_scores
+
+    try:
+        result = snapshot_scores(full=full, batch_size=batch_size)
+    except Exception as e:
+        logger.error(f"Error snapshotting credit scores: {e}", exc_info=True)
+        return {"rescored": 0}
+
+    logger.info(f"✅ Credit score snapshot written: {result}")
+    return result
+
+
+# ========================
+# Celery Task: prune_idempotency_keys
+# ========================
+@app.task(bind=True, name="credit_celery.prune_idempotency_keys")
+def prune_idempotency_keys(self):
+    """Delete create-loan idempotency keys older than CREDIT_IDEMPOTENCY_TTL_HOURS."""
+    from credit.services.idempotency import prune_idempotency_keys as prune
+
+    try:
+        deleted = prune()
+    except Exception as e:
+        logger.error(f"Error pruning idempotency keys: {e}", exc_info=True)
+        return {"deleted": 0}
+
+    logger.info(f"✅ Pruned {deleted} expired idempotency keys")
+    return {"deleted": deleted}
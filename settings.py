@@ -1,4 +1,5 @@
 from pathlib import Path
+import copy
 import os
 
 # ========================
@@ -40,6 +41,8 @@ INSTALLED_APPS = [
 # MIDDLEWARE
 # ========================
 MIDDLEWARE = [
+    "credit.middleware.RequestMetricsMiddleware",
+    "credit.middleware.RequestProfilerMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -93,6 +96,64 @@ DATABASES = {
     }
 }
 
+# Connection reuse, per process role ("web" or "worker"; credit_celery sets worker):
+#   none        - a new connection per request / task
+#   persistent  - keep connections for DB_CONN_MAX_AGE seconds, health-checked
+#   pool        - psycopg 3 connection pool (Django 5.1+), sized per role
+#   pgbouncer   - DB_HOST/DB_PORT point at PgBouncer in transaction mode; server-side
+#                 cursors are disabled and session advisory locks (bootstrap_data)
+#                 must run against the database directly
+# Django advises against persistent connections under ASGI (every request runs
+# its ORM work on a fresh thread), so ASGI servers default to the pool instead.
+CREDIT_PROCESS_ROLE = os.getenv("CREDIT_PROCESS_ROLE", "web")
+CREDIT_SERVER_INTERFACE = os.getenv("CREDIT_SERVER_INTERFACE", "wsgi")  # asgi.py sets "asgi"
+DB_POOL_MODE = os.getenv(
+    "DB_POOL_MODE", "pool" if CREDIT_SERVER_INTERFACE == "asgi" else "persistent"
+)
+
+
+def _role_setting(name, default):
+    role = CREDIT_PROCESS_ROLE.upper()
+    return int(os.getenv(f"{name}_{role}", os.getenv(name, default)))
+
+
+if DB_POOL_MODE == "persistent":
+    DATABASES["default"]["CONN_MAX_AGE"] = _role_setting("DB_CONN_MAX_AGE", "60")
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+elif DB_POOL_MODE == "pool":
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            # Per process: gunicorn workers x max_size must fit max_connections
+            "min_size": _role_setting("DB_POOL_MIN_SIZE", "2"),
+            "max_size": _role_setting("DB_POOL_MAX_SIZE", "10"),
+            "timeout": _role_setting("DB_POOL_TIMEOUT", "10"),
+        },
+    }
+elif DB_POOL_MODE == "pgbouncer":
+    DATABASES["default"]["CONN_MAX_AGE"] = _role_setting("DB_CONN_MAX_AGE", "60")
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+# Read replicas: comma-separated hosts sharing the primary's settings, and/or
+# an SQLite copy for local testing. Only views wrapped in
+# credit.db_router.replica_reads / ReplicaReadMixin read from them.
+for _index, _host in enumerate(filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), 1):
+    DATABASES[f"replica{_index}"] = {
+        **copy.deepcopy(DATABASES["default"]),
+        "HOST": _host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+if os.getenv("DB_REPLICA_SQLITE"):
+    DATABASES["replica_sqlite"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.getenv("DB_REPLICA_SQLITE"),
+        "TEST": {"MIRROR": "default"},
+    }
+
+CREDIT_REPLICA_ALIASES = [alias for alias in DATABASES if alias != "default"]
+if CREDIT_REPLICA_ALIASES:
+    DATABASE_ROUTERS = ["credit.db_router.PrimaryReplicaRouter"]
+
 # ========================
 # Django REST Framework
 # ========================
@@ -131,8 +192,98 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 # ========================
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# ========================
+# CACHE (Redis when available)
+# ========================
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+            "KEY_PREFIX": "credit",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 # ========================
 # CELERY SETTINGS (Redis backend)
 # ========================
 CELERY_BROKER_URL = os.getenv("REDIS_URL")       # Redis hostname provided by Render
-CELERY_RESULT_BACKEND = os.getenv("REDIS_URL")
\ No newline at end of file
+CELERY_RESULT_BACKEND = os.getenv("REDIS_URL")
+
+# ========================
+# CREDIT APP SETTINGS
+# ========================
+# Business IDs reserved per process and round trip (1 = one nextval per insert)
+CREDIT_ID_BLOCK_SIZE = int(os.getenv("CREDIT_ID_BLOCK_SIZE", "1"))
+
+# Rows per INSERT ... ON CONFLICT statement during spreadsheet ingestion
+CREDIT_INGEST_BATCH_SIZE = int(os.getenv("CREDIT_INGEST_BATCH_SIZE", "1000"))
+
+# Read source files in CREDIT_INGEST_BATCH_SIZE chunks instead of loading them whole
+CREDIT_INGEST_STREAMING = os.getenv("CREDIT_INGEST_STREAMING", "false").lower() == "true"
+
+# Skip already-ingested files and write only new or changed rows
+CREDIT_INGEST_DELTA = os.getenv("CREDIT_INGEST_DELTA", "true").lower() == "true"
+
+# Fan the nightly ingestion out as row-range shards across Celery workers
+CREDIT_INGEST_SHARDED = os.getenv("CREDIT_INGEST_SHARDED", "false").lower() == "true"
+CREDIT_INGEST_SHARD_SIZE = int(os.getenv("CREDIT_INGEST_SHARD_SIZE", "50000"))
+# Excel sources are converted to CSV here before sharding; must be visible to every worker
+CREDIT_INGEST_STAGING_DIR = os.getenv("CREDIT_INGEST_STAGING_DIR", os.path.join(BASE_DIR, "staging"))
+
+# Upper bound on requests accepted by /api/check-eligibility/batch/
+CREDIT_BATCH_ELIGIBILITY_MAX = int(os.getenv("CREDIT_BATCH_ELIGIBILITY_MAX", "50000"))
+
+# Credit score cache: shared tier TTL, in-process LRU size and TTL (seconds)
+CREDIT_SCORE_CACHE_ENABLED = os.getenv("CREDIT_SCORE_CACHE_ENABLED", "true").lower() == "true"
+CREDIT_SCORE_CACHE_TTL = int(os.getenv("CREDIT_SCORE_CACHE_TTL", "300"))
+CREDIT_SCORE_CACHE_LOCAL_SIZE = int(os.getenv("CREDIT_SCORE_CACHE_LOCAL_SIZE", "10000"))
+CREDIT_SCORE_CACHE_LOCAL_TTL = int(os.getenv("CREDIT_SCORE_CACHE_LOCAL_TTL", "5"))
+
+# Rows fetched per server-side cursor round trip by the streaming exports
+CREDIT_EXPORT_CHUNK_SIZE = int(os.getenv("CREDIT_EXPORT_CHUNK_SIZE", "2000"))
+
+# Seconds between checks for a newly published credit policy version
+CREDIT_POLICY_RELOAD_INTERVAL = int(os.getenv("CREDIT_POLICY_RELOAD_INTERVAL", "30"))
+
+# Per-request query / DB / serializer timing, Server-Timing headers and /metrics
+CREDIT_METRICS_ENABLED = os.getenv("CREDIT_METRICS_ENABLED", "false").lower() == "true"
+CREDIT_METRICS_SERVER_TIMING = os.getenv("CREDIT_METRICS_SERVER_TIMING", "true").lower() == "true"
+
+# Slow-request profiling: "sampling" (stack snapshots) or "cprofile"; captures
+# over the threshold plus a random sample are written to CREDIT_PROFILE_DIR
+CREDIT_PROFILING_ENABLED = os.getenv("CREDIT_PROFILING_ENABLED", "false").lower() == "true"
+CREDIT_PROFILE_MODE = os.getenv("CREDIT_PROFILE_MODE", "sampling")
+CREDIT_PROFILE_THRESHOLD_MS = int(os.getenv("CREDIT_PROFILE_THRESHOLD_MS", "500"))
+CREDIT_PROFILE_SAMPLE_RATE = float(os.getenv("CREDIT_PROFILE_SAMPLE_RATE", "0.01"))
+CREDIT_PROFILE_SAMPLE_INTERVAL = float(os.getenv("CREDIT_PROFILE_SAMPLE_INTERVAL", "0.005"))
+CREDIT_PROFILE_PATH_PREFIX = os.getenv("CREDIT_PROFILE_PATH_PREFIX", "/api/")
+CREDIT_PROFILE_DIR = os.getenv("CREDIT_PROFILE_DIR", "profiles")
+
+# Closed loans are archived this many days after end_date, in batches
+CREDIT_ARCHIVE_AFTER_DAYS = int(os.getenv("CREDIT_ARCHIVE_AFTER_DAYS", "90"))
+CREDIT_ARCHIVE_BATCH_SIZE = int(os.getenv("CREDIT_ARCHIVE_BATCH_SIZE", "5000"))
+
+# Connection attempts (exponential backoff) before the data bootstrap gives up
+CREDIT_BOOTSTRAP_DB_ATTEMPTS = int(os.getenv("CREDIT_BOOTSTRAP_DB_ATTEMPTS", "10"))
+
+# Seconds reads about a just-written customer/loan stay on the primary
+# (keep above replica lag)
+CREDIT_REPLICA_PIN_SECONDS = int(os.getenv("CREDIT_REPLICA_PIN_SECONDS", "5"))
+
+# Portfolio analytics: rows per streamed chunk and cache lifetime of served results
+CREDIT_ANALYTICS_CHUNK_SIZE = int(os.getenv("CREDIT_ANALYTICS_CHUNK_SIZE", "50000"))
+CREDIT_ANALYTICS_CACHE_TTL = int(os.getenv("CREDIT_ANALYTICS_CACHE_TTL", "3600"))
+
+# Credit score snapshots: customers scored per batch and days of history kept (0 keeps all)
+CREDIT_SCORE_SNAPSHOT_BATCH_SIZE = int(os.getenv("CREDIT_SCORE_SNAPSHOT_BATCH_SIZE", "20000"))
+CREDIT_SCORE_SNAPSHOT_RETENTION_DAYS = int(os.getenv("CREDIT_SCORE_SNAPSHOT_RETENTION_DAYS", "90"))
+
+# Hours a create-loan Idempotency-Key is remembered before it is pruned and may be reused
+CREDIT_IDEMPOTENCY_TTL_HOURS = int(os.getenv("CREDIT_IDEMPOTENCY_TTL_HOURS", "24"))
@@ -1,7 +1,8 @@
 from django.urls import path, include
-from credit.views import dashboard
+from credit.views import dashboard, metrics
 
 urlpatterns = [
     path("", dashboard, name="dashboard"),  # Render HTML
     path("api/", include("credit.urls")),   # All APIs under /api/
+    path("metrics", metrics, name="metrics"),  # Prometheus scrape
 ]
\ No newline at end of file